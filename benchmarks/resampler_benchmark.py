@@ -0,0 +1,35 @@
+# resampler_benchmark.py
+# Measures the CPU cost of downmixing and resampling captured audio to 16 kHz.
+# Run from the repository root: python -m benchmarks.resampler_benchmark
+
+import time
+import numpy as np
+from src.audio.resampler import StreamingResampler
+
+TARGET_RATE = 16000
+SECONDS = 30
+BLOCK_FRAMES = 1024
+
+
+def benchmark(rate: int, channels: int) -> float:
+    """Returns the CPU seconds spent per second of audio for one device format."""
+    rng = np.random.default_rng(0)
+    audio = rng.uniform(-0.5, 0.5, size=(rate * SECONDS, channels)).astype(np.float32)
+    resampler = StreamingResampler(rate, TARGET_RATE, channels)
+
+    start = time.process_time()
+    for offset in range(0, len(audio), BLOCK_FRAMES):
+        resampler.process(audio[offset:offset + BLOCK_FRAMES])
+    resampler.flush()
+    elapsed = time.process_time() - start
+
+    return elapsed / SECONDS
+
+
+if __name__ == "__main__":
+    print(f"{'rate':>7} {'ch':>3} {'taps':>5} {'CPU ms / s audio':>17}")
+    for rate in (16000, 22050, 44100, 48000):
+        for channels in (1, 2):
+            cost = benchmark(rate, channels)
+            taps = StreamingResampler(rate, TARGET_RATE, channels).taps
+            print(f"{rate:>7} {channels:>3} {taps:>5} {cost * 1000:>17.3f}")
@@ -1,12 +1,15 @@
 # main.py
 
 import sys
-from src.nasikh import Nasikh
-from PySide6.QtCore import QLockFile, QDir
+import multiprocessing
 
 
 def main():
     """Main function to run the Dictation Application."""
+    # Imported here: the spawned capture process re-runs this module and should only load numpy and sounddevice
+    from src.nasikh import Nasikh
+    from PySide6.QtCore import QLockFile, QDir
+
     LOCK_FILE_NAME = "nasikh.lock"
     # Create a lock file in the system's temporary directory
     lock_file_path = QDir.tempPath() + "/" + LOCK_FILE_NAME
@@ -21,4 +24,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Needed for the capture process in the frozen executable
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
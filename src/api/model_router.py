@@ -0,0 +1,152 @@
+import json
+import random
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+class ModelStats:
+    """
+    Exponentially weighted fit of request time against request size for one model:
+    time = overhead + size / throughput. Size is output tokens for chat models and
+    seconds of audio for transcription models.
+    """
+
+    DECAY = 0.9
+
+    def __init__(self, data: Optional[Dict] = None):
+        data = data or {}
+        self.samples: int = data.get("samples", 0)
+        self.error_rate: float = data.get("error_rate", 0.0)
+        # Weighted sums for the least-squares fit
+        self.weight: float = data.get("weight", 0.0)
+        self.sum_x: float = data.get("sum_x", 0.0)
+        self.sum_y: float = data.get("sum_y", 0.0)
+        self.sum_xx: float = data.get("sum_xx", 0.0)
+        self.sum_xy: float = data.get("sum_xy", 0.0)
+
+    def to_dict(self) -> Dict:
+        return dict(vars(self))
+
+    def add(self, size: float, seconds: float) -> None:
+        self.samples += 1
+        self.error_rate *= self.DECAY
+        if size <= 0:
+            # An empty result says nothing about throughput and would make the model look instant
+            return
+        self.weight = self.weight * self.DECAY + 1
+        self.sum_x = self.sum_x * self.DECAY + size
+        self.sum_y = self.sum_y * self.DECAY + seconds
+        self.sum_xx = self.sum_xx * self.DECAY + size * size
+        self.sum_xy = self.sum_xy * self.DECAY + size * seconds
+
+    def add_error(self) -> None:
+        self.samples += 1
+        self.error_rate = self.error_rate * self.DECAY + (1 - self.DECAY)
+
+    def fit(self) -> Optional[Tuple[float, float]]:
+        """Returns (overhead seconds, seconds per unit of size), or None before the first success."""
+        if self.weight == 0 or self.sum_x <= 0:
+            return None
+        mean_x = self.sum_x / self.weight
+        mean_y = self.sum_y / self.weight
+        variance = self.sum_xx / self.weight - mean_x * mean_x
+        if variance <= 1e-9:
+            # All requests had the same size so far; attribute the time to throughput
+            return 0.0, mean_y / mean_x
+        slope = max((self.sum_xy / self.weight - mean_x * mean_y) / variance, 0.0)
+        overhead = max(mean_y - slope * mean_x, 0.0)
+        return overhead, slope
+
+    def predict(self, size: float) -> Optional[float]:
+        fit = self.fit()
+        if fit is None:
+            return None
+        overhead, slope = fit
+        return overhead + slope * size
+
+
+class ModelRouter:
+    """
+    Learns how fast each (provider, model) is from real dictations and picks the model
+    expected to finish first for a given request size, among the models the user approved.
+    Short requests therefore go to the lowest-overhead model and long ones to the highest
+    throughput model. Statistics are kept in a JSON file next to the config.
+    """
+
+    MIN_SAMPLES = 3
+    EXPLORE_RATE = 0.1
+    MAX_ERROR_RATE = 0.3
+
+    def __init__(self, path: str = "model_stats.json"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.stats: Dict[Tuple[str, str], ModelStats] = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                for key, data in json.load(file).items():
+                    provider, model = key.split("|", 1)
+                    self.stats[(provider, model)] = ModelStats(data)
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def get(self, provider: str, model: str) -> ModelStats:
+        return self.stats.setdefault((provider, model), ModelStats())
+
+    def record(self, provider: str, model: str, size: float, seconds: float) -> None:
+        with self.lock:
+            self.get(provider, model).add(size, seconds)
+            self.save()
+
+    def record_error(self, provider: str, model: str) -> None:
+        with self.lock:
+            self.get(provider, model).add_error()
+            self.save()
+
+    def save(self) -> None:
+        data = {f"{provider}|{model}": stats.to_dict() for (provider, model), stats in self.stats.items()}
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=4)
+
+    def rank(self, candidates: List[Tuple[str, str]], size: float) -> List[Tuple[str, str]]:
+        """Orders candidates by predicted time for a request of `size`, fastest first."""
+        with self.lock:
+            def usable(candidate: Tuple[str, str]) -> bool:
+                stats = self.get(*candidate)
+                return stats.fit() is not None and stats.error_rate <= self.MAX_ERROR_RATE
+
+            def expected(index: int) -> Tuple[int, float, int]:
+                if not usable(candidates[index]):
+                    # Unusable models keep their configured order behind the usable ones
+                    return (1, 0.0, index)
+                return (0, self.get(*candidates[index]).predict(size), index)
+
+            ranked = [candidates[index] for index in sorted(range(len(candidates)), key=expected)]
+
+            # Models we know little about, or that failed recently, only get traffic by exploring;
+            # a demoted model's error rate decays with each success, so it can recover
+            healthy = any(usable(candidate) and self.get(*candidate).samples >= self.MIN_SAMPLES
+                          for candidate in candidates)
+
+            def uncertain(candidate: Tuple[str, str]) -> bool:
+                stats = self.get(*candidate)
+                if stats.error_rate > self.MAX_ERROR_RATE:
+                    # Only probe a failing model while a measured healthy one can take over
+                    return healthy
+                return stats.samples < self.MIN_SAMPLES
+
+            # Now and then send a request to one of them so it gets measured again
+            explore = [candidate for candidate in candidates if uncertain(candidate)]
+            if explore and random.random() < self.EXPLORE_RATE:
+                first = random.choice(explore)
+                return [first] + [candidate for candidate in ranked if candidate != first]
+        return ranked
+
+    def describe(self, provider: str, model: str, unit: str) -> str:
+        """A short human readable summary of a model's measured speed for the settings tabs."""
+        stats = self.stats.get((provider, model))
+        fit = stats.fit() if stats is not None else None
+        if fit is None:
+            return "not measured yet"
+        overhead, slope = fit
+        speed = f"{1 / slope:.0f} {unit}/s" if slope > 0 else "no size effect"
+        return f"{overhead:.2f} s + {speed}, {stats.error_rate:.0%} errors, {stats.samples} runs"
@@ -0,0 +1,166 @@
+import re
+import time
+import threading
+from typing import Dict, List, Mapping, Optional, Tuple
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """Parses Groq style durations such as '2m59.56s' or '450ms' into seconds."""
+    parts = DURATION_PART.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(number) * DURATION_UNITS[unit] for number, unit in parts)
+
+
+def parse_reset(value: str, now: float) -> Optional[float]:
+    """Turns a reset header into an absolute time; accepts durations and epoch timestamps."""
+    try:
+        number = float(value)
+    except ValueError:
+        duration = parse_duration(value)
+        return now + duration if duration is not None else None
+    if number > 1e12:
+        # OpenRouter sends the reset time in epoch milliseconds
+        return number / 1000
+    if number > 1e9:
+        return number
+    return now + number
+
+
+class Bucket:
+    """What the provider last told us about one model's limits."""
+
+    def __init__(self):
+        self.remaining_requests: Optional[float] = None
+        self.requests_reset_at: float = 0.0
+        self.remaining_tokens: Optional[float] = None
+        self.tokens_reset_at: float = 0.0
+        self.blocked_until: float = 0.0
+        self.last_sent: float = 0.0
+
+    def refill(self, now: float) -> None:
+        """Forgets counters whose window has reset; the next response reports fresh ones."""
+        if self.remaining_requests is not None and now >= self.requests_reset_at:
+            self.remaining_requests = None
+        if self.remaining_tokens is not None and now >= self.tokens_reset_at:
+            self.remaining_tokens = None
+
+
+class RateLimitScheduler:
+    """
+    Paces requests per (provider, model) from the rate-limit headers the providers return.
+    Callers ask for a slot with a list of acceptable models; when the preferred one is
+    out of budget the request moves to an alternative that is not, and otherwise waits
+    for the window to reset. Interactive requests are served before background ones.
+    """
+
+    # Below this many remaining requests, spread the rest evenly over the reset window
+    PACE_BELOW = 5
+    MAX_WAIT_STEP = 1.0
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.buckets: Dict[Tuple[str, str], Bucket] = {}
+        self.waiting = {INTERACTIVE: 0, BACKGROUND: 0}
+
+    def bucket(self, provider: str, model: str) -> Bucket:
+        return self.buckets.setdefault((provider, model), Bucket())
+
+    def delay(self, provider: str, model: str, tokens: int, now: float) -> float:
+        """Seconds until a request of `tokens` tokens may be sent to this model."""
+        bucket = self.bucket(provider, model)
+        bucket.refill(now)
+        delay = max(0.0, bucket.blocked_until - now)
+
+        if bucket.remaining_requests is not None:
+            if bucket.remaining_requests < 1:
+                delay = max(delay, bucket.requests_reset_at - now)
+            elif bucket.remaining_requests < self.PACE_BELOW:
+                spacing = (bucket.requests_reset_at - now) / bucket.remaining_requests
+                delay = max(delay, bucket.last_sent + spacing - now)
+
+        if bucket.remaining_tokens is not None and bucket.remaining_tokens < tokens:
+            delay = max(delay, bucket.tokens_reset_at - now)
+
+        return delay
+
+    def acquire(self, candidates: List[Tuple[str, str]], tokens: int = 0,
+                priority: int = INTERACTIVE) -> Tuple[str, str]:
+        """
+        Blocks until one of the candidate models has budget and returns it.
+        The first candidate is preferred whenever it is available right away.
+        """
+        with self.condition:
+            self.waiting[priority] += 1
+            try:
+                while True:
+                    now = time.time()
+                    if priority == BACKGROUND and self.waiting[INTERACTIVE]:
+                        self.condition.wait(self.MAX_WAIT_STEP)
+                        continue
+
+                    delays = [self.delay(provider, model, tokens, now) for provider, model in candidates]
+                    best = min(range(len(candidates)), key=lambda index: (delays[index], index))
+                    if delays[best] <= 0:
+                        self.reserve(candidates[best], tokens, now)
+                        return candidates[best]
+
+                    self.condition.wait(min(delays[best], self.MAX_WAIT_STEP))
+            finally:
+                self.waiting[priority] -= 1
+                self.condition.notify_all()
+
+    def reserve(self, candidate: Tuple[str, str], tokens: int, now: float) -> None:
+        """Counts a request against the budget until the response reports the real numbers."""
+        bucket = self.bucket(*candidate)
+        bucket.last_sent = now
+        if bucket.remaining_requests is not None:
+            bucket.remaining_requests -= 1
+        if bucket.remaining_tokens is not None:
+            bucket.remaining_tokens -= tokens
+
+    def update(self, provider: str, model: str, headers: Mapping[str, str]) -> None:
+        """Reads the rate-limit headers of a response from Groq or OpenRouter."""
+        now = time.time()
+        with self.condition:
+            bucket = self.bucket(provider, model)
+
+            # Groq: x-ratelimit-{remaining,reset}-{requests,tokens}
+            remaining = headers.get("x-ratelimit-remaining-requests")
+            reset = headers.get("x-ratelimit-reset-requests")
+            # OpenRouter: x-ratelimit-{remaining,reset}
+            if remaining is None:
+                remaining = headers.get("x-ratelimit-remaining")
+                reset = headers.get("x-ratelimit-reset")
+
+            if remaining is not None:
+                bucket.remaining_requests = float(remaining)
+                bucket.requests_reset_at = (parse_reset(reset, now) if reset else None) or now + 60
+
+            remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+            if remaining_tokens is not None:
+                reset = headers.get("x-ratelimit-reset-tokens")
+                bucket.remaining_tokens = float(remaining_tokens)
+                bucket.tokens_reset_at = (parse_reset(reset, now) if reset else None) or now + 60
+
+            self.condition.notify_all()
+
+    def rate_limited(self, provider: str, model: str, headers: Mapping[str, str]) -> None:
+        """Blocks a model after a 429 until its retry-after time, or briefly if none was given."""
+        self.update(provider, model, headers)
+        now = time.time()
+        retry_after = headers.get("retry-after")
+        until = parse_reset(retry_after, now) if retry_after else None
+        with self.condition:
+            bucket = self.bucket(provider, model)
+            bucket.blocked_until = max(bucket.blocked_until, until or now + 5)
+            self.condition.notify_all()
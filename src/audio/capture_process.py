@@ -0,0 +1,210 @@
+import time
+import threading
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import Callable, Dict
+
+
+HEADER_BYTES = 16
+STATS_KEYS = ("input_overflow", "input_underflow", "ring_overrun")
+
+
+class SharedRing:
+    """
+    Single-producer, single-consumer ring of int16 samples in shared memory.
+    The first 8 bytes hold the total number of samples ever written; the writer
+    copies the samples first and bumps that counter last, so a reader never
+    sees a position whose data is not there yet.
+    """
+
+    def __init__(self, capacity: int, name: str | None = None):
+        create = name is None
+        self.capacity = capacity
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=HEADER_BYTES + capacity * 2)
+
+        self.written = np.ndarray((1,), dtype=np.int64, buffer=self.shm.buf[:8])
+        self.data = np.ndarray((capacity,), dtype=np.int16, buffer=self.shm.buf[HEADER_BYTES:])
+        if create:
+            self.written[0] = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, samples: np.ndarray) -> None:
+        """Appends samples, overwriting the oldest ones if the reader fell behind."""
+        samples = samples.reshape(-1)
+        total = len(samples)
+        samples = samples[-self.capacity:]
+        written = int(self.written[0]) + total - len(samples)
+        start = written % self.capacity
+        first = min(len(samples), self.capacity - start)
+        self.data[start:start + first] = samples[:first]
+        self.data[:len(samples) - first] = samples[first:]
+        self.written[0] = written + len(samples)
+
+    def read(self, position: int) -> tuple[np.ndarray, int, int]:
+        """Returns the samples after `position`, the new position and how many samples were lost."""
+        written = int(self.written[0])
+        lost = max(0, written - position - self.capacity)
+        position += lost
+        count = written - position
+        if count <= 0:
+            return np.zeros(0, dtype=np.int16), position, lost
+
+        start = position % self.capacity
+        first = min(count, self.capacity - start)
+        samples = np.concatenate((self.data[start:start + first], self.data[:count - first]))
+        return samples, written, lost
+
+    def close(self, unlink: bool = False) -> None:
+        del self.written, self.data
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def capture_main(connection, ring_name: str, capacity: int) -> None:
+    """Entry point of the capture process: owns the PortAudio stream and serves control messages."""
+    import sounddevice as sd
+
+    ring = SharedRing(capacity, ring_name)
+    stream = None
+    stats = dict.fromkeys(STATS_KEYS, 0)
+
+    def callback(indata, frames, time, status):
+        if status.input_overflow:
+            stats["input_overflow"] += 1
+        if status.input_underflow:
+            stats["input_underflow"] += 1
+        ring.write(indata)
+
+    while True:
+        command, *arguments = connection.recv()
+        if command == "open":
+            samplerate, channels = arguments
+            stats = dict.fromkeys(STATS_KEYS, 0)
+            try:
+                stream = sd.InputStream(samplerate=samplerate, channels=channels,
+                                        callback=callback, dtype="int16")
+                stream.start()
+                connection.send(("ok", None))
+            except Exception as error:
+                stream = None
+                connection.send(("error", str(error)))
+        elif command == "close":
+            if stream is not None:
+                stream.stop()
+                stream.close()
+                stream = None
+            connection.send(("ok", stats))
+        elif command == "quit":
+            break
+
+    ring.close()
+
+
+class RemoteStream:
+    """
+    Stands in for `sd.InputStream` when capture runs in the capture process.
+    A reader thread in this process moves samples out of the shared ring and hands
+    them to `callback` as int16 blocks shaped (frames, channels).
+    """
+
+    POLL_SECONDS = 0.02
+
+    def __init__(self, capture: "CaptureProcess", samplerate: int, channels: int,
+                 callback: Callable[[np.ndarray], None]):
+        self.capture = capture
+        self.samplerate = samplerate
+        self.channels = channels
+        self.callback = callback
+        self.stats = dict.fromkeys(STATS_KEYS, 0)
+        self.running = threading.Event()
+        self.reader = threading.Thread(target=self.read_loop, daemon=True)
+
+    def start(self) -> None:
+        self.position = int(self.capture.ring.written[0])
+        self.capture.request("open", self.samplerate, self.channels)
+        self.running.set()
+        self.reader.start()
+
+    def stop(self) -> None:
+        try:
+            stats = self.capture.request("close")
+        finally:
+            # Even if the capture process is gone, stop the reader and keep what it wrote
+            self.running.clear()
+            self.reader.join()
+            # Pick up whatever the callback wrote before the stream stopped
+            self.drain()
+        for key in ("input_overflow", "input_underflow"):
+            self.stats[key] += stats[key]
+
+    def close(self) -> None:
+        pass
+
+    def read_loop(self) -> None:
+        while self.running.is_set():
+            self.drain()
+            time.sleep(self.POLL_SECONDS)
+
+    def drain(self) -> None:
+        samples, self.position, lost = self.capture.ring.read(self.position)
+        if lost:
+            self.stats["ring_overrun"] += 1
+        # Only hand over whole frames; a partial frame stays for the next read
+        usable = len(samples) - len(samples) % self.channels
+        self.position -= len(samples) - usable
+        if usable:
+            self.callback(samples[:usable].reshape(-1, self.channels))
+
+
+class CaptureProcess:
+    """
+    Runs audio capture in a separate process so it does not share the GIL with
+    Qt, the hotkey listener and the API clients. Frames arrive through a
+    shared-memory ring; open/close requests go over a pipe.
+    """
+
+    def __init__(self, capacity_seconds: int = 10, max_rate: int = 48000, max_channels: int = 2):
+        self.ring = SharedRing(capacity_seconds * max_rate * max_channels)
+        self.lock = threading.Lock()
+        self.start()
+
+    def start(self) -> None:
+        """Starts the capture process; also used to replace one that died."""
+        self.connection, child_connection = mp.Pipe()
+        self.process = mp.get_context("spawn").Process(
+            target=capture_main,
+            args=(child_connection, self.ring.name, self.ring.capacity),
+            daemon=True,
+        )
+        self.process.start()
+
+    def stream(self, samplerate: int, channels: int, callback: Callable[[np.ndarray], None]) -> RemoteStream:
+        if not self.process.is_alive():
+            self.start()
+        return RemoteStream(self, samplerate, channels, callback)
+
+    def request(self, command: str, *arguments) -> Dict | None:
+        """Sends a control message and waits for the capture process to answer it."""
+        with self.lock:
+            try:
+                self.connection.send((command, *arguments))
+                status, payload = self.connection.recv()
+            except (EOFError, OSError) as error:
+                raise RuntimeError("Audio capture failed: the capture process stopped") from error
+        if status == "error":
+            raise RuntimeError(f"Audio capture failed: {payload}")
+        return payload
+
+    def shutdown(self) -> None:
+        with self.lock:
+            try:
+                self.connection.send(("quit",))
+            except OSError:
+                pass
+        self.process.join(timeout=2)
+        self.ring.close(unlink=True)
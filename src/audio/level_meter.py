@@ -0,0 +1,41 @@
+import numpy as np
+from math import sqrt
+
+
+class LevelMeter:
+    """
+    Recent input levels shared between the audio callback and the recording window.
+    The callback is the only writer and the GUI only reads, so no lock is needed:
+    values go into a preallocated ring and the write counter is bumped last.
+    """
+
+    def __init__(self, size: int = 64):
+        self.size = size
+        # Column 0 holds the block RMS and column 1 the block peak
+        self.levels = np.zeros((size, 2), dtype=np.float32)
+        self.count = 0
+
+    def reset(self) -> None:
+        """Clears the history before a new recording starts."""
+        self.levels.fill(0.0)
+        self.count = 0
+
+    def publish(self, block: np.ndarray) -> None:
+        """Reduces one float32 block to a single RMS/peak pair; called from the audio callback."""
+        samples = block.reshape(-1)
+        if samples.size == 0:
+            return
+
+        slot = self.count % self.size
+        self.levels[slot, 0] = sqrt(float(np.dot(samples, samples)) / samples.size)
+        self.levels[slot, 1] = max(float(samples.max()), -float(samples.min()))
+        self.count += 1
+
+    def read(self, out: np.ndarray) -> int:
+        """Copies the history into `out` oldest first and returns the write counter it reflects."""
+        count = self.count
+        slot = count % self.size
+        tail = self.size - slot
+        out[:tail] = self.levels[slot:]
+        out[tail:] = self.levels[:slot]
+        return count
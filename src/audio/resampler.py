@@ -0,0 +1,85 @@
+import numpy as np
+from math import gcd
+
+
+class StreamingResampler:
+    """
+    Downmixes and resamples audio blocks to a target rate with a polyphase FIR filter.
+    Keeps the filter history between calls, so blocks can be fed one after another.
+    """
+
+    def __init__(self, input_rate: int, output_rate: int, channels: int = 1, half_taps: int = 16):
+        divisor = gcd(int(input_rate), int(output_rate))
+        self.input_rate = int(input_rate)
+        self.output_rate = int(output_rate)
+        self.channels = int(channels)
+        self.up = self.output_rate // divisor
+        self.down = self.input_rate // divisor
+
+        # Polyphase bank: row p holds the taps used for output samples with phase p
+        self.bank = self.design_filter(half_taps)
+        self.taps = self.bank.shape[1]
+        self.offsets = np.arange(self.taps)
+
+        # Input samples still needed by future outputs and the next output position
+        self.history = np.zeros(self.taps - 1, dtype=np.float32)
+        self.position = 0
+
+    def design_filter(self, half_taps: int) -> np.ndarray:
+        """Builds a Kaiser-windowed sinc low-pass and splits it into polyphase rows."""
+        factor = max(self.up, self.down)
+        length = -(-2 * half_taps * factor // self.up) * self.up
+        cutoff = 0.95 / factor
+
+        n = np.arange(length) - (length - 1) / 2
+        h = cutoff * np.sinc(cutoff * n) * np.kaiser(length, 8.0) * self.up
+
+        # Row p holds h[p], h[p + up], ...; reversed so it lines up with input windows
+        bank = h.reshape(-1, self.up).T[:, ::-1]
+        return np.ascontiguousarray(bank, dtype=np.float32)
+
+    def downmix(self, block: np.ndarray) -> np.ndarray:
+        """Averages interleaved channels into a mono float32 signal."""
+        if block.dtype == np.int16:
+            block = block.astype(np.float32) / 32768.0
+        if block.ndim == 2:
+            block = block.mean(axis=1) if block.shape[1] > 1 else block[:, 0]
+        return np.asarray(block, dtype=np.float32)
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Resamples one block of input and returns the output samples available so far."""
+        samples = self.downmix(block)
+        if self.up == self.down:
+            return samples
+
+        signal = np.concatenate((self.history, samples))
+        # Output n reads the taps-long window starting at (position + n * down) // up
+        available = len(signal) - (self.taps - 1)
+        count = max(0, -(-(available * self.up - self.position) // self.down))
+        if count == 0:
+            self.history = signal
+            return np.zeros(0, dtype=np.float32)
+
+        steps = self.position + np.arange(count) * self.down
+        starts = steps // self.up
+        phases = steps % self.up
+
+        windows = signal[starts[:, None] + self.offsets]
+        output = np.einsum("ij,ij->i", windows, self.bank[phases])
+
+        # Carry over the next output position relative to the retained history
+        consumed = (self.position + count * self.down) // self.up
+        self.position = (self.position + count * self.down) - consumed * self.up
+        self.history = signal[consumed:]
+        return output.astype(np.float32, copy=False)
+
+    def flush(self) -> np.ndarray:
+        """Pushes the filter tail out with silence at the end of a recording."""
+        if self.up == self.down:
+            return np.zeros(0, dtype=np.float32)
+        return self.process(np.zeros(self.taps // 2, dtype=np.float32))
+
+
+def to_int16(samples: np.ndarray) -> np.ndarray:
+    """Converts float samples in [-1, 1] to clipped int16 PCM."""
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
@@ -0,0 +1,175 @@
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from datetime import datetime
+from contextlib import contextmanager
+from collections import Counter
+
+
+class SamplingProfiler:
+    """
+    Samples one thread's call stack at a fixed interval from a helper thread.
+    Costs nothing until started, so it can be switched on in the middle of a slow run.
+    Writes folded stacks ("outer;inner count"), the input format of flame graph tools.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        # start() may come from a timer racing with stop(); once stopped, it never starts
+        self.lock = threading.Lock()
+        self.started = False
+
+    def start(self) -> None:
+        with self.lock:
+            if self.stopped.is_set():
+                return
+            self.started = True
+            self.thread.start()
+
+    def stop(self) -> bool:
+        """Stops sampling and returns whether it ever started."""
+        with self.lock:
+            self.stopped.set()
+            started = self.started
+        if started:
+            self.thread.join()
+        return started
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+
+class Diagnostics:
+    """
+    On-demand profiling of dictations, written to timestamped files in a diagnostics folder:
+    - a cProfile of the processing of the next N dictations,
+    - a tracemalloc snapshot diff from the start of a recording to the end of its processing,
+    - a sampling profile of any dictation that runs past a latency threshold (opt-in).
+    The profilers only profile the job worker thread that runs the dictation.
+    """
+
+    def __init__(self, folder: str = "diagnostics"):
+        self.folder = folder
+        self.lock = threading.Lock()
+        self.profile_remaining = 0
+        self.slow_threshold: float | None = None
+        self.memory_armed = False
+        self.memory_snapshot: tracemalloc.Snapshot | None = None
+        self.memory_job: int | None = None
+
+    def path(self, kind: str, extension: str) -> str:
+        os.makedirs(self.folder, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        return os.path.join(self.folder, f"{stamp}-{kind}.{extension}")
+
+    # __________ CPU __________
+
+    def profile_next(self, count: int) -> None:
+        with self.lock:
+            self.profile_remaining = count
+
+    @contextmanager
+    def dictation(self, label: str):
+        """Wraps the processing of one dictation with whichever profiler is armed."""
+        with self.lock:
+            profiling = self.profile_remaining > 0
+            if profiling:
+                self.profile_remaining -= 1
+        if profiling:
+            with self.cpu_profile(label):
+                yield
+        elif self.slow_threshold is not None:
+            with self.slow_profile(label, self.slow_threshold):
+                yield
+        else:
+            yield
+
+    @contextmanager
+    def cpu_profile(self, label: str):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(self.path(f"cpu-{label}", "prof"))
+            with open(self.path(f"cpu-{label}", "txt"), "w", encoding="utf-8") as file:
+                pstats.Stats(profiler, stream=file).sort_stats("cumulative").print_stats(40)
+
+    @contextmanager
+    def slow_profile(self, label: str, threshold: float):
+        """Starts sampling only once the dictation has taken longer than `threshold` seconds."""
+        sampler = SamplingProfiler(threading.get_ident())
+        timer = threading.Timer(threshold, sampler.start)
+        timer.daemon = True
+        started = time.perf_counter()
+        timer.start()
+        try:
+            yield
+        finally:
+            # The timer may already be running start(); stop() makes sure it either never starts or ends here
+            timer.cancel()
+            if sampler.stop():
+                elapsed = time.perf_counter() - started
+                sampler.write(self.path(f"slow-{label}-{elapsed:.1f}s", "folded"))
+
+    # __________ Memory __________
+
+    def arm_memory(self) -> None:
+        with self.lock:
+            self.memory_armed = True
+
+    def recording_started(self) -> None:
+        """Takes the first snapshot if a memory diff was requested for this recording."""
+        with self.lock:
+            if not self.memory_armed or self.memory_snapshot is not None:
+                return
+            self.memory_armed = False
+            tracemalloc.start()
+            self.memory_snapshot = tracemalloc.take_snapshot()
+
+    def recording_queued(self, job_id: int) -> None:
+        """Ties the pending snapshot to the job that will process this recording."""
+        with self.lock:
+            if self.memory_snapshot is not None and self.memory_job is None:
+                self.memory_job = job_id
+
+    def recording_cancelled(self) -> None:
+        with self.lock:
+            if self.memory_snapshot is not None and self.memory_job is None:
+                self.memory_snapshot = None
+                tracemalloc.stop()
+
+    def job_finished(self, job_id: int) -> None:
+        """Writes the memory diff once the snapshotted recording has been processed, or failed to."""
+        with self.lock:
+            if job_id != self.memory_job:
+                return
+            after = tracemalloc.take_snapshot()
+            before, self.memory_snapshot, self.memory_job = self.memory_snapshot, None, None
+            tracemalloc.stop()
+
+        with open(self.path(f"memory-job{job_id}", "txt"), "w", encoding="utf-8") as file:
+            for stat in after.compare_to(before, "lineno")[:50]:
+                file.write(f"{stat}\n")
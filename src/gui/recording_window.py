@@ -1,11 +1,62 @@
-from PySide6.QtCore import Qt,Signal
-from PySide6.QtGui import QShortcut, QKeySequence
+import numpy as np
+from PySide6.QtCore import Qt, Signal, QTimer, QRectF
+from PySide6.QtGui import QShortcut, QKeySequence, QPainter, QColor
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
     QLabel,
     QApplication,
 )
+from src.audio.level_meter import LevelMeter
+
+
+class LevelMeterWidget(QWidget):
+    """Draws the recent input levels as bars, repainting at most `fps` times per second."""
+
+    def __init__(self, meter: LevelMeter, fps: int = 30):
+        super().__init__()
+        self.meter = meter
+        self.levels = np.zeros_like(meter.levels)
+        self.last_count = -1
+        self.setMinimumHeight(40)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000 // fps)
+        self.timer.timeout.connect(self.poll)
+
+    def poll(self) -> None:
+        """Schedules a repaint only when the audio callback published new levels."""
+        if self.meter.count != self.last_count:
+            self.last_count = self.meter.read(self.levels)
+            self.update()
+
+    def showEvent(self, event):
+        self.last_count = -1
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor(255, 255, 255, 150))
+        painter.drawRoundedRect(QRectF(self.rect()), 10, 10)
+
+        bars = len(self.levels)
+        bar_width = self.width() / bars
+        middle = self.height() / 2
+        for index in range(bars):
+            rms, peak = self.levels[index]
+            # Peaks in a light shade behind the RMS so clipping is visible at a glance
+            x = index * bar_width
+            for level, color in ((peak, QColor(255, 150, 150)), (rms, QColor(220, 0, 0))):
+                half = min(float(level), 1.0) * (middle - 4)
+                painter.setBrush(color)
+                painter.drawRect(QRectF(x + 1, middle - half, bar_width - 2, 2 * half + 1))
+        painter.end()
 
 
 class RecordingWindow(QWidget):
@@ -14,7 +65,7 @@ class RecordingWindow(QWidget):
     recording_cancelled = Signal()
     recording_paused = Signal()
 
-    def __init__(self):
+    def __init__(self, level_meter: LevelMeter):
         super().__init__()
         self.setWindowFlags(Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.FramelessWindowHint)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
@@ -23,8 +74,10 @@ class RecordingWindow(QWidget):
         self.label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.label.setStyleSheet("font-size: 30px; color: red; background-color: rgba(255, 255, 255, 150); border-radius: 10px; padding: 20px;")
         self._layout.addWidget(self.label)
+        self.level_meter = LevelMeterWidget(level_meter)
+        self._layout.addWidget(self.level_meter)
         self.setLayout(self._layout)
-        self.setFixedSize(300, 100)
+        self.setFixedSize(300, 160)
         self.center_on_screen()
 
         cancel_shortcut = QShortcut(QKeySequence("Escape"), self)
@@ -45,11 +98,13 @@ class RecordingWindow(QWidget):
         self.activateWindow()
 
     def pause_recording(self):
-        if self.label.text() == "Recording...":
-            self.recording_paused.emit()
+        # The app answers with set_paused once it knows whether pausing or resuming worked
+        self.recording_paused.emit()
+
+    def set_paused(self, paused: bool) -> None:
+        if paused:
             self.label.setText("Paused")
             self.label.setStyleSheet("font-size: 30px; color: gray; background-color: rgba(255, 255, 255, 150); border-radius: 10px; padding: 20px;")
         else:
-            self.recording_paused.emit()
             self.label.setText("Recording...")
-            self.label.setStyleSheet("font-size: 30px; color: red; background-color: rgba(255, 255, 255, 150); border-radius: 10px; padding: 20px;")
\ No newline at end of file
+            self.label.setStyleSheet("font-size: 30px; color: red; background-color: rgba(255, 255, 255, 150); border-radius: 10px; padding: 20px;")
@@ -1,5 +1,6 @@
 from openai import OpenAI
 from typing import Dict, List, Optional, Any
+from PySide6.QtCore import Qt
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -8,12 +9,60 @@ from PySide6.QtWidgets import (
     QTextEdit,
     QLineEdit,
     QTabWidget,
+    QListWidget,
+    QListWidgetItem,
 )
+from src.api.model_router import ModelRouter
+
+
+class RoutingList(QListWidget):
+    """Checkable list of a provider's models with their measured speed, used to pick routing candidates."""
+
+    def __init__(self, router: ModelRouter, unit: str, candidates: List[List[str]]):
+        super().__init__()
+        self.router = router
+        self.unit = unit
+        self.candidates = [list(candidate) for candidate in candidates]
+        self.provider: Optional[str] = None
+        self.setMaximumHeight(120)
+
+    def populate(self, provider: str, models: List[str]) -> None:
+        """Lists the provider's models, keeping the choices made for other providers."""
+        self.candidates = self.selected()
+        self.clear()
+        self.provider = provider
+        for model in models or []:
+            item = QListWidgetItem(f"{model}  ({self.router.describe(provider, model, self.unit)})")
+            item.setData(Qt.ItemDataRole.UserRole, model)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            checked = [provider, model] in self.candidates
+            item.setCheckState(Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked)
+            self.addItem(item)
+
+    def refresh(self) -> None:
+        """Updates the speed shown next to each model."""
+        for row in range(self.count()):
+            item = self.item(row)
+            model = item.data(Qt.ItemDataRole.UserRole)
+            item.setText(f"{model}  ({self.router.describe(self.provider, model, self.unit)})")
+
+    def selected(self) -> List[List[str]]:
+        """Returns the approved (provider, model) pairs across all providers."""
+        if self.provider is None:
+            return self.candidates
+        others = [candidate for candidate in self.candidates if candidate[0] != self.provider]
+        checked = [
+            [self.provider, self.item(row).data(Qt.ItemDataRole.UserRole)]
+            for row in range(self.count())
+            if self.item(row).checkState() == Qt.CheckState.Checked
+        ]
+        return others + checked
 
 
 class ChatTab(QWidget):
     def __init__(self, tab_name: str, chat_endpoints: Dict[str, str], provider: Optional[str], 
-                 model: Optional[str], prompt: Optional[str], api_keys: Dict[str, Optional[str]]):
+                 model: Optional[str], prompt: Optional[str], api_keys: Dict[str, Optional[str]],
+                 router: ModelRouter, candidates: List[List[str]]):
         
         super().__init__()
         self.tab_name = tab_name
@@ -22,11 +71,15 @@ class ChatTab(QWidget):
         self.provider = provider
         self.model = model
         self.prompt = prompt
+        self.router = router
 
         self.provider_label = QLabel(f"{self.tab_name} Chat Provider:")
         self.create_provider_menu()
 
         self.model_label = QLabel(f"{self.tab_name} Chat Model:")
+        self.speed_label = QLabel()
+        self.routing_label = QLabel(f"{self.tab_name} Auto-Routing Models (fastest checked model is used):")
+        self.routing_list = RoutingList(self.router, "tokens", candidates)
         self.create_model_menu()
 
         self.prompt_label = QLabel(f"{self.tab_name} Prompt:")
@@ -46,12 +99,19 @@ class ChatTab(QWidget):
         """Create the model combo box and populate it"""
         self.models = self.get_provider_models(self.provider_menu.currentText())
         self.model_menu = QComboBox()
+        self.model_menu.currentTextChanged.connect(self.update_speed_label)
         self.model_menu.addItems(self.models)
         if self.model is not None:
             self.model_menu.setCurrentText(self.model)
+        self.routing_list.populate(self.provider_menu.currentText(), self.models)
 
         self.provider_menu.currentTextChanged.connect(self.update_model_menu)
 
+    def update_speed_label(self) -> None:
+        """Show the measured speed of the selected model"""
+        speed = self.router.describe(self.provider_menu.currentText(), self.model_menu.currentText(), "tokens")
+        self.speed_label.setText(f"Measured speed: {speed}")
+
     def create_prompt_field(self) -> None:
         """Create the prompt text edit field"""
         self.prompt_field = QTextEdit()
@@ -65,6 +125,9 @@ class ChatTab(QWidget):
         self._layout.addWidget(self.provider_menu)
         self._layout.addWidget(self.model_label)
         self._layout.addWidget(self.model_menu)
+        self._layout.addWidget(self.speed_label)
+        self._layout.addWidget(self.routing_label)
+        self._layout.addWidget(self.routing_list)
         self._layout.addWidget(self.prompt_field)
         self._layout.addStretch(1)
 
@@ -87,11 +150,13 @@ class ChatTab(QWidget):
         self.model_menu.clear()
         models = self.get_provider_models(self.provider_menu.currentText())
         self.model_menu.addItems(models)
+        self.routing_list.populate(self.provider_menu.currentText(), models)
 
 
 class TranscriptionTab(QWidget):
     def __init__(self, transcription_endpoints: Dict[str, str], provider: Optional[str], 
-                 model: Optional[str], api_keys: Dict[str, Optional[str]]):
+                 model: Optional[str], api_keys: Dict[str, Optional[str]],
+                 router: ModelRouter, candidates: List[List[str]]):
         
         super().__init__()
         self.tab_name = "Transcription"
@@ -99,11 +164,15 @@ class TranscriptionTab(QWidget):
         self.transcription_provider = provider
         self.transcription_model = model
         self.api_keys = api_keys
+        self.router = router
 
         self.provider_label = QLabel("Transcription Provider:")
         self.create_provider_menu()
 
         self.model_label = QLabel("Transcription Model:")
+        self.speed_label = QLabel()
+        self.routing_label = QLabel("Transcription Auto-Routing Models (fastest checked model is used):")
+        self.routing_list = RoutingList(self.router, "audio-seconds", candidates)
         self.create_model_menu()
 
         self.create_layout()
@@ -120,12 +189,20 @@ class TranscriptionTab(QWidget):
         """Create the model combo box and populate it"""
         models = self.get_provider_models(self.provider_menu.currentText())
         self.model_menu = QComboBox()
+        self.model_menu.currentTextChanged.connect(self.update_speed_label)
         self.model_menu.addItems(models)
         if self.transcription_model is not None:
             self.model_menu.setCurrentText(self.transcription_model)
+        self.routing_list.populate(self.provider_menu.currentText(), models)
 
         self.provider_menu.currentTextChanged.connect(self.update_model_menu)
 
+    def update_speed_label(self) -> None:
+        """Show the measured speed of the selected model"""
+        speed = self.router.describe(self.provider_menu.currentText(), self.model_menu.currentText(),
+                                     "audio-seconds")
+        self.speed_label.setText(f"Measured speed: {speed}")
+
     def create_layout(self) -> None:
         """Create the layout for the tab"""
         self._layout = QVBoxLayout()
@@ -133,6 +210,9 @@ class TranscriptionTab(QWidget):
         self._layout.addWidget(self.provider_menu)
         self._layout.addWidget(self.model_label)
         self._layout.addWidget(self.model_menu)
+        self._layout.addWidget(self.speed_label)
+        self._layout.addWidget(self.routing_label)
+        self._layout.addWidget(self.routing_list)
         self._layout.addStretch(1)
 
     def get_provider_models(self, provider: str) -> List[str]:
@@ -158,6 +238,7 @@ class TranscriptionTab(QWidget):
         self.model_menu.clear()
         models = self.get_provider_models(self.provider_menu.currentText())
         self.model_menu.addItems(models)
+        self.routing_list.populate(self.provider_menu.currentText(), models)
 
 
 class APIKeysTab(QWidget):
@@ -7,6 +7,11 @@ from PySide6.QtWidgets import (
 
 class Tray(QSystemTrayIcon):
     setting = Signal()
+    history_selected = Signal(str)
+    profile_requested = Signal()
+    memory_requested = Signal()
+    slow_profiling_toggled = Signal(bool)
+    diagnostics_opened = Signal()
     def __init__(self, icon, app):
         super().__init__(icon, parent=app)
         self.app = app
@@ -18,6 +23,31 @@ class Tray(QSystemTrayIcon):
         self.setting_action.triggered.connect(self.setting.emit)
         self.menu.addAction(self.setting_action)
 
+        # Create a "History" menu with recent results
+        self.history_menu = QMenu("History")
+        self.history_actions = []
+        self.menu.addMenu(self.history_menu)
+
+        # Create a "Diagnostics" menu with the profiling hooks
+        self.diagnostics_menu = QMenu("Diagnostics")
+        self.profile_action = QAction("Profile Next Dictations")
+        self.profile_action.triggered.connect(self.profile_requested.emit)
+        self.diagnostics_menu.addAction(self.profile_action)
+
+        self.memory_action = QAction("Memory Snapshot of Next Recording")
+        self.memory_action.triggered.connect(self.memory_requested.emit)
+        self.diagnostics_menu.addAction(self.memory_action)
+
+        self.slow_action = QAction("Profile Slow Dictations")
+        self.slow_action.setCheckable(True)
+        self.slow_action.toggled.connect(self.slow_profiling_toggled.emit)
+        self.diagnostics_menu.addAction(self.slow_action)
+
+        self.open_diagnostics_action = QAction("Open Diagnostics Folder")
+        self.open_diagnostics_action.triggered.connect(self.diagnostics_opened.emit)
+        self.diagnostics_menu.addAction(self.open_diagnostics_action)
+        self.menu.addMenu(self.diagnostics_menu)
+
         # Create a "Quit" action
         self.quit_action = QAction("Quit")
         self.quit_action.triggered.connect(self.app.quit)
@@ -25,3 +55,15 @@ class Tray(QSystemTrayIcon):
 
         self.setContextMenu(self.menu)
         self.setVisible(True)
+
+    def set_history(self, results):
+        """Rebuilds the history menu; choosing an entry copies it to the clipboard."""
+        self.history_menu.clear()
+        self.history_actions = []
+        for result in results:
+            preview = result if len(result) <= 50 else result[:50] + "..."
+            action = QAction(preview.replace("\n", " "))
+            action.triggered.connect(lambda checked=False, text=result: self.history_selected.emit(text))
+            self.history_menu.addAction(action)
+            self.history_actions.append(action)
+        self.history_menu.setEnabled(bool(results))
@@ -6,6 +6,8 @@ from PySide6.QtCore import QObject
 ENGLISH_HOTKEY_ID = 1
 TRANSLATION_HOTKEY_ID = 2
 ARABIC_HOTKEY_ID = 3
+FANOUT_HOTKEY_ID = 4
+ALTERNATE_HOTKEY_ID = 5
 
 class HotkeyForWindows(QObject):
     """
@@ -24,6 +26,8 @@ class HotkeyForWindows(QObject):
         self.create_english_hotkey()
         self.create_translation_hotkey()
         self.create_arabic_hotkey()
+        self.create_fanout_hotkey()
+        self.create_alternate_hotkey()
 
     def create_english_hotkey(self):
         mods = win32con.MOD_ALT
@@ -43,11 +47,25 @@ class HotkeyForWindows(QObject):
         ctypes.windll.user32.RegisterHotKey(self.hwnd, ARABIC_HOTKEY_ID, mods, key)
         return (mods, key)
 
+    def create_fanout_hotkey(self):
+        mods = win32con.MOD_ALT
+        key = ord('B')
+        ctypes.windll.user32.RegisterHotKey(self.hwnd, FANOUT_HOTKEY_ID, mods, key)
+        return (mods, key)
+
+    def create_alternate_hotkey(self):
+        mods = win32con.MOD_ALT
+        key = ord('E')
+        ctypes.windll.user32.RegisterHotKey(self.hwnd, ALTERNATE_HOTKEY_ID, mods, key)
+        return (mods, key)
+
     def unregister_hotkeys(self):
         """Unregisters all hotkeys to clean up."""
         ctypes.windll.user32.UnregisterHotKey(self.hwnd, ENGLISH_HOTKEY_ID)
         ctypes.windll.user32.UnregisterHotKey(self.hwnd, TRANSLATION_HOTKEY_ID)
         ctypes.windll.user32.UnregisterHotKey(self.hwnd, ARABIC_HOTKEY_ID)
+        ctypes.windll.user32.UnregisterHotKey(self.hwnd, FANOUT_HOTKEY_ID)
+        ctypes.windll.user32.UnregisterHotKey(self.hwnd, ALTERNATE_HOTKEY_ID)
 
     def handle_native_event(self, event_type, message):
         """
@@ -66,4 +84,10 @@ class HotkeyForWindows(QObject):
                 elif ARABIC_HOTKEY_ID == msg.wParam:
                     self.parent_window.hotkey_pressed.emit("arabic")
                     return True, 0
+                elif FANOUT_HOTKEY_ID == msg.wParam:
+                    self.parent_window.hotkey_pressed.emit("fanout")
+                    return True, 0
+                elif ALTERNATE_HOTKEY_ID == msg.wParam:
+                    self.parent_window.hotkey_pressed.emit("alternate")
+                    return True, 0
         return False, 0
\ No newline at end of file
@@ -0,0 +1,137 @@
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+
+
+class JobQueue:
+    """
+    Durable FIFO of finished recordings, stored in SQLite.
+    A recording is written here before any network call, so it survives
+    network failures, rate limits and app restarts.
+    """
+
+    def __init__(self, path: str = "nasikh_jobs.db"):
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=FULL")
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at REAL NOT NULL,
+                    mode TEXT NOT NULL,
+                    audio BLOB,
+                    target INTEGER,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    finished_at REAL,
+                    capture_stats TEXT
+                )
+                """
+            )
+            # Databases created before capture stats were recorded lack the column
+            columns = [row["name"] for row in self.connection.execute("PRAGMA table_info(jobs)")]
+            if "capture_stats" not in columns:
+                self.connection.execute("ALTER TABLE jobs ADD COLUMN capture_stats TEXT")
+
+    def enqueue(self, mode: str, audio: bytes, target: Optional[int] = None,
+                capture_stats: Optional[Dict[str, int]] = None) -> int:
+        """Stores a recording as a pending job and returns its id."""
+        with self.lock, self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO jobs (created_at, mode, audio, target, capture_stats) VALUES (?, ?, ?, ?, ?)",
+                (time.time(), mode, sqlite3.Binary(audio), target,
+                 json.dumps(capture_stats) if capture_stats is not None else None),
+            )
+            return cursor.lastrowid
+
+    def next_pending(self, newer_than: Optional[float] = None, older_than: Optional[float] = None,
+                     exclude: Iterable[int] = ()) -> Optional[Dict]:
+        """
+        Returns the oldest pending job, optionally only among jobs created in a time window
+        and not in `exclude`; later jobs wait behind it to keep paste order.
+        """
+        query = "SELECT * FROM jobs WHERE status = 'pending'"
+        parameters: List = []
+        if newer_than is not None:
+            query += " AND created_at >= ?"
+            parameters.append(newer_than)
+        if older_than is not None:
+            query += " AND created_at < ?"
+            parameters.append(older_than)
+        exclude = list(exclude)
+        if exclude:
+            query += f" AND id NOT IN ({', '.join('?' * len(exclude))})"
+            parameters.extend(exclude)
+
+        with self.lock:
+            row = self.connection.execute(query + " ORDER BY id LIMIT 1", parameters).fetchone()
+        return dict(row) if row is not None else None
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        """Returns a job's details without its audio."""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT id, created_at, mode, target, status, attempts, result, error, capture_stats "
+                "FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    def mark_done(self, job_id: int, result: str) -> None:
+        """Stores the result and drops the audio, which is no longer needed."""
+        with self.lock, self.connection:
+            self.connection.execute(
+                "UPDATE jobs SET status = 'done', result = ?, audio = NULL, error = NULL, "
+                "finished_at = ? WHERE id = ?",
+                (result, time.time(), job_id),
+            )
+
+    def mark_retry(self, job_id: int, error: str, delay: float) -> None:
+        """Keeps the job pending and holds it back for `delay` seconds."""
+        with self.lock, self.connection:
+            self.connection.execute(
+                "UPDATE jobs SET attempts = attempts + 1, error = ?, next_attempt_at = ? WHERE id = ?",
+                (error, time.time() + delay, job_id),
+            )
+
+    def mark_failed(self, job_id: int, error: str) -> None:
+        """Parks a job that cannot succeed as is; its audio is kept so it can be requeued."""
+        with self.lock, self.connection:
+            self.connection.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                (error, time.time(), job_id),
+            )
+
+    def requeue_failed(self) -> int:
+        """Moves failed jobs back to pending, e.g. after the API keys were changed."""
+        with self.lock, self.connection:
+            cursor = self.connection.execute(
+                "UPDATE jobs SET status = 'pending', attempts = 0, next_attempt_at = 0 "
+                "WHERE status = 'failed'"
+            )
+            return cursor.rowcount
+
+    def pending_count(self) -> int:
+        with self.lock:
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'pending'"
+            ).fetchone()[0]
+
+    def history(self, limit: int = 10) -> List[Dict]:
+        """Returns the most recent finished results, newest first."""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT id, mode, result, finished_at FROM jobs WHERE status = 'done' "
+                "ORDER BY id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [dict(row) for row in rows]
@@ -0,0 +1,101 @@
+import time
+import threading
+import openai
+from typing import Callable, Dict, Set
+from PySide6.QtCore import QObject, Signal
+from src.jobs.job_queue import JobQueue
+
+
+class JobWorker(QObject):
+    """
+    Drains the job queue on two background threads. One takes fresh recordings, the user
+    is waiting on those; the other takes the backlog, i.e. jobs older than `fresh_seconds`
+    left over from an outage or a restart. So a new dictation never queues behind the
+    backlog. Each thread handles its jobs one at a time and in order. Transient failures
+    (network, rate limits, server errors) keep the job at the head of its lane and retry
+    with backoff; the UI thread never waits on either.
+    """
+
+    job_finished = Signal(int, str)
+    job_failed = Signal(int, str)
+
+    MAX_BACKOFF_SECONDS = 60
+
+    def __init__(self, queue: JobQueue, process: Callable[[Dict], str], fresh_seconds: float):
+        super().__init__()
+        self.queue = queue
+        self.process = process
+        self.fresh_seconds = fresh_seconds
+        # Jobs a thread is working on or backing off; a job that turns stale meanwhile stays with it
+        self.active: Set[int] = set()
+        self.lock = threading.Lock()
+        self.wakeups = {True: threading.Event(), False: threading.Event()}
+        self.threads = [threading.Thread(target=self.run, args=(fresh,), daemon=True) for fresh in (True, False)]
+
+    def start(self) -> None:
+        for thread in self.threads:
+            thread.start()
+
+    def notify(self) -> None:
+        """Wakes the workers after a new job was enqueued."""
+        for wakeup in self.wakeups.values():
+            wakeup.set()
+
+    def claim(self, fresh: bool) -> Dict | None:
+        """Takes the oldest pending job of one lane that the other lane is not working on."""
+        cutoff = time.time() - self.fresh_seconds
+        with self.lock:
+            if fresh:
+                job = self.queue.next_pending(newer_than=cutoff, exclude=self.active)
+            else:
+                job = self.queue.next_pending(older_than=cutoff, exclude=self.active)
+            if job is not None:
+                self.active.add(job["id"])
+        return job
+
+    def run(self, fresh: bool) -> None:
+        wakeup = self.wakeups[fresh]
+        while True:
+            job = self.claim(fresh)
+            if job is None:
+                # Fresh jobs turn into backlog as they age, so the backlog lane also looks again by itself
+                wakeup.wait(None if fresh else self.fresh_seconds)
+                wakeup.clear()
+                continue
+
+            try:
+                delay = job["next_attempt_at"] - time.time()
+                if delay > 0:
+                    # Backing off; a new job of this lane does not jump ahead, so only the timeout matters
+                    time.sleep(delay)
+                    continue
+
+                try:
+                    result = self.process(job)
+                except Exception as error:
+                    self.handle_error(job, error)
+                    continue
+
+                self.queue.mark_done(job["id"], result)
+                self.job_finished.emit(job["id"], result)
+            finally:
+                with self.lock:
+                    self.active.discard(job["id"])
+
+    def handle_error(self, job: Dict, error: Exception) -> None:
+        """Retries transient failures and parks jobs that need the user's attention."""
+        if not isinstance(error, openai.APIError) or isinstance(error, (
+                openai.AuthenticationError, openai.PermissionDeniedError,
+                openai.BadRequestError, openai.NotFoundError)):
+            self.queue.mark_failed(job["id"], str(error))
+            self.job_failed.emit(job["id"], str(error))
+            return
+
+        delay = min(self.MAX_BACKOFF_SECONDS, 2 ** job["attempts"])
+        if isinstance(error, openai.APIStatusError):
+            retry_after = error.response.headers.get("retry-after")
+            try:
+                delay = max(delay, float(retry_after))
+            except (TypeError, ValueError):
+                pass
+        self.queue.mark_retry(job["id"], str(error), delay)
@@ -1,24 +1,40 @@
 # nasikh.py
 
 import io
+import os
+import re
 import sys
 import wave
 import json
 import time
+import ctypes
 import platform
 import pyperclip
+import openai
 import threading
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 import sounddevice as sd
 from openai import OpenAI
-from typing import List, Dict
+from typing import Callable, List, Dict, Tuple
 from src.gui.tray import Tray
 from src.gui.tabs import ChatTab, TranscriptionTab, APIKeysTab, TabsManager
 from src.hotkey.hotkey_manager import HotkeyManager
 from src.gui.recording_window import RecordingWindow
+from src.audio.resampler import StreamingResampler, to_int16
+from src.audio.level_meter import LevelMeter
+from src.audio.capture_process import CaptureProcess, RemoteStream
+from src.text.chunking import chunk_text, split_sentences, join_chunks
+from src.pipeline.incremental_cleanup import IncrementalCleanup
+from src.pipeline.speculative_transcription import SpeculativeTranscription
+from src.jobs.job_queue import JobQueue
+from src.jobs.job_worker import JobWorker
+from src.api.rate_limiter import RateLimitScheduler, INTERACTIVE, BACKGROUND
+from src.api.model_router import ModelRouter
+from src.diagnostics.profiler import Diagnostics
 from pynput.keyboard import Key, Controller
-from PySide6.QtCore import Slot
-from PySide6.QtGui import QIcon
+from PySide6.QtCore import Qt, Slot, QUrl, QTimer
+from PySide6.QtGui import QIcon, QDesktopServices
 from PySide6.QtWidgets import (
     QVBoxLayout,
     QApplication,
@@ -71,6 +87,75 @@ class Nasikh:
         self.audio_chunks: List = []
         self.MAX_FILE_SIZE_MB: int = 25
         self.RATE: int = 16000
+        # Capture at the device's own rate and channel count, then resample in-process
+        self.native_capture: bool = False
+        self.capture_rate: int = self.RATE
+        self.capture_channels: int = 1
+        self.resampler: StreamingResampler | None = None
+        self.pcm_chunks: List[np.ndarray] = []
+        self.pcm_samples: int = 0
+        self.audio_lock = threading.Lock()
+        # Captured blocks are converted this often while recording, so stopping only converts the tail
+        self.CONVERT_INTERVAL_MS: int = 500
+        self.level_meter = LevelMeter()
+        # Optionally run PortAudio in its own process; xruns are counted per recording either way
+        self.capture_process: bool = False
+        self.capture: CaptureProcess | None = None
+        self.capture_stats: Dict[str, int] = {}
+
+        # ________ Cleanup settings ________
+        # Long transcripts are cleaned as parallel chunks of about this many characters
+        self.chunked_cleanup: bool = True
+        self.CLEANUP_CHUNK_CHARS: int = 1500
+        self.CLEANUP_WORKERS: int = 4
+        # Rough size of a token for rate-limit budgets and routing estimates
+        self.CHARS_PER_TOKEN: int = 2
+        # Clean each finished stretch of speech while the user is still talking
+        self.incremental_cleanup: bool = False
+        self.incremental_final_pass: bool = False
+        self.INCREMENTAL_CONTEXT_CHARS: int = 1500
+        self.incremental: IncrementalCleanup | None = None
+        # Transcribe what was recorded so far whenever the user pauses
+        self.speculative_transcription: bool = True
+        self.speculative: SpeculativeTranscription | None = None
+
+        # ________ Rate Limits ________
+        # Shared by dictations and background work; alternatives are keyed by mode or "transcription"
+        self.scheduler = RateLimitScheduler()
+        self.fallback_models: Dict[str, List[List[str]]] = {}
+
+        # ________ Model Routing ________
+        # Per mode (or "transcription"), the models the user approved for automatic routing
+        self.router = ModelRouter()
+        self.routing_candidates: Dict[str, List[List[str]]] = {}
+
+        # ________ Diagnostics ________
+        self.diagnostics = Diagnostics()
+        self.PROFILE_DICTATIONS: int = 5
+        # Opt-in: sample the stack of any dictation that takes longer than this
+        self.profile_slow_dictations: bool = False
+        self.slow_dictation_seconds: float = 8.0
+
+        # __________ Job Queue __________
+        # Recordings are stored before any network call and processed in order in the background
+        self.job_queue = JobQueue()
+        # Results delivered this long after the recording went to history instead of being pasted;
+        # older jobs are backlog and are processed alongside, not ahead of, new dictations
+        self.PASTE_WINDOW_SECONDS: int = 60
+        self.job_worker = JobWorker(self.job_queue, self.process_job, self.PASTE_WINDOW_SECONDS)
+        # In-flight incremental cleanups and speculative transcriptions by job id;
+        # lost on restart, then the job starts from its audio
+        self.incremental_jobs: Dict[int, IncrementalCleanup] = {}
+        self.speculative_jobs: Dict[int, SpeculativeTranscription] = {}
+
+        # ________ Custom And Fan-out Modes ________
+        # User-defined mode profiles: name -> {"provider", "model", "prompt", optional "language"}
+        self.custom_modes: Dict[str, Dict[str, str]] = {}
+        # Modes a fan-out dictation is cleaned with in parallel; the first one is pasted
+        self.fanout_modes: List[str] = ["arabic", "translation"]
+        self.fanout_results: Dict[int, List[str]] = {}
+        # The other outputs of the last fan-out dictation, pasted one per Alt+E
+        self.alternates: List[str] = []
 
         # __________ Operations __________
         self.mode: str | None = None
@@ -89,67 +174,211 @@ class Nasikh:
         self.icon: QIcon = QIcon("C:\\Users\\hamdy\\Documents\\nasikh\\nasikh_icon.ico")
         self.setting: QDialog = QDialog()
         self.tray: Tray = Tray(self.icon, self.app)
-        self.tray.setting.connect(self.setting.show)
-        self.recording_window: RecordingWindow = RecordingWindow()
+        self.tray.setting.connect(self.show_settings)
+        self.tray.history_selected.connect(pyperclip.copy)
+        self.tray.profile_requested.connect(self.profile_next_dictations)
+        self.tray.memory_requested.connect(self.diagnostics.arm_memory)
+        self.tray.slow_profiling_toggled.connect(self.toggle_slow_profiling)
+        self.tray.diagnostics_opened.connect(self.open_diagnostics)
+        self.job_worker.job_finished.connect(self.deliver_result, Qt.ConnectionType.QueuedConnection)
+        self.job_worker.job_failed.connect(self.report_failure, Qt.ConnectionType.QueuedConnection)
+        self.recording_window: RecordingWindow = RecordingWindow(self.level_meter)
         self.recording_window.recording_cancelled.connect(self.cancel_recording)
         self.recording_window.recording_paused.connect(self.pause_toggle)
+        self.convert_timer = QTimer()
+        self.convert_timer.setInterval(self.CONVERT_INTERVAL_MS)
+        self.convert_timer.timeout.connect(self.convert_audio)
 
         # __________ Hotkeys __________
         self.hotkey = HotkeyManager()
-        self.hotkey.hotkey_pressed.connect(lambda lang: self.toggle_dictation(lang))
+        self.hotkey.hotkey_pressed.connect(self.handle_hotkey)
     
-    def transcript(self, audio) -> str:
+    def transcript(self, audio, mode: str | None = None, priority: int = INTERACTIVE) -> str:
         """Transcribes audio using the configured transcription model."""
-        config = self.get_transcription_config()
-        client = OpenAI(
-            base_url=config["api_endpoint"],
-            api_key=config["api_key"],
-        )
+        mode = mode or self.mode
+        config = self.get_transcription_config(mode)
+        audio_bytes = audio.getvalue()
 
-        # construct the parameters for the transcription request
-        language = "en" if self.mode == "english" else "ar"
-        parameters = {
-            "file": ("audio.wav", audio),
-            "model": self.transcription_model,
-            "language": language,
-            "temperature": 0.0
-        }
-        # Special handling for Groq API
-        if config["provider"] == "groq":
-            parameters["response_format"] = "text"
-        
-        transcription = client.audio.transcriptions.create(**parameters)
+        def send(provider: str, model: str):
+            # Retries go through the scheduler and the job worker, which see every 429
+            client = OpenAI(
+                base_url=self.transcription_endpoints[provider],
+                api_key=self.api_keys[provider],
+                max_retries=0,
+            )
+
+            # construct the parameters for the transcription request
+            language = "en" if mode == "english" else self.custom_modes.get(mode, {}).get("language", "ar")
+            parameters = {
+                "file": ("audio.wav", audio_bytes),
+                "model": model,
+                "language": language,
+                "temperature": 0.0
+            }
+            # Special handling for Groq API
+            if provider == "groq":
+                parameters["response_format"] = "text"
+            
+            return client.audio.transcriptions.with_raw_response.create(**parameters)
 
-        return transcription
+        # 16-bit mono WAV after a 44 byte header
+        seconds = max(len(audio_bytes) - 44, 0) / (2 * self.RATE)
+        candidates = self.request_candidates("transcription", config["provider"], self.transcription_model, seconds)
+        return self.send_with_limits(send, candidates, 0, priority, lambda transcription: seconds)
     
-    def cleanup(self, user_input: str) -> str:
+    def cleanup(self, user_input: str, mode: str | None = None, priority: int = INTERACTIVE) -> str:
         """Cleans up the user input using the configured chat model."""
-        config = self.get_chat_config()
-        client = OpenAI(
-            base_url=config["api_endpoint"],
-            api_key=config["api_key"],
+        config = self.get_chat_config(mode)
+        config["priority"] = priority
+
+        if self.chunked_cleanup and len(user_input) > self.CLEANUP_CHUNK_CHARS:
+            return self.cleanup_chunked(config, user_input)
+
+        return self.complete(config, config["prompt"] + "\n\n" + user_input)
+
+    def cleanup_chunked(self, config: Dict, user_input: str) -> str:
+        """
+        Cleans a long transcript as sentence-aligned chunks in parallel.
+        Each chunk sees the neighbouring sentences as read-only context.
+        """
+        chunks = chunk_text(user_input, self.CLEANUP_CHUNK_CHARS)
+        if len(chunks) == 1:
+            return self.complete(config, config["prompt"] + "\n\n" + user_input)
+
+        def build_message(index: int) -> str:
+            before = split_sentences(chunks[index - 1][0])[-1] if index > 0 else ""
+            after = split_sentences(chunks[index + 1][0])[0] if index + 1 < len(chunks) else ""
+            return (
+                config["prompt"] + "\n\n"
+                + "The text is one part of a longer dictation. The sentences inside <context> tags "
+                + "come right before and after it; use them only to understand the text and do not "
+                + "include them in your output. Only output the refined text from inside the <text> tags.\n\n"
+                + f"<context>{before}</context>\n<text>{chunks[index][0]}</text>\n<context>{after}</context>"
+            )
+
+        with ThreadPoolExecutor(max_workers=min(len(chunks), self.CLEANUP_WORKERS)) as executor:
+            cleaned = list(executor.map(
+                lambda index: self.complete(config, build_message(index)),
+                range(len(chunks))
+            ))
+
+        cleaned = [self.strip_tags(text) for text in cleaned]
+        return join_chunks(cleaned, [separator for _, separator in chunks])
+
+    def cleanup_segment(self, context: str, previous: str, user_input: str, mode: str | None = None) -> str:
+        """
+        Cleans the next stretch of an ongoing dictation together with the last cleaned sentence,
+        so corrections of that sentence are applied. Earlier text is read-only context.
+        """
+        config = self.get_chat_config(mode)
+        content = (
+            config["prompt"] + "\n\n"
+            + "The text is the next part of a dictation that is still in progress. The text inside "
+            + "<context> tags has already been refined; use it only to understand what follows and do "
+            + "not include it in your output. Refine the text inside <previous> tags followed by the "
+            + "text inside <text> tags as one passage. If the new text corrects something said in "
+            + "<previous>, keep only the corrected version. Output only the refined passage.\n\n"
+            + f"<context>{context[-self.INCREMENTAL_CONTEXT_CHARS:]}</context>\n"
+            + f"<previous>{previous}</previous>\n<text>{user_input}</text>"
         )
+        return self.strip_tags(self.complete(config, content))
+
+    def strip_tags(self, text: str) -> str:
+        """Models sometimes echo the prompt's tags back; drop them."""
+        return re.sub(r"</?(text|context|previous)>", "", text)
 
-        # construct the parameters for the chat completion request
-        parameters = {
-            "model": config["model_name"],
-            "messages": [
-            {
-                "role": "user",
-                "content": config["prompt"] + "\n\n" + user_input
+    def complete(self, config: Dict, content: str) -> str:
+        """Sends a single chat completion request and returns the reply text."""
+        def send(provider: str, model: str):
+            # Retries go through the scheduler and the job worker, which see every 429
+            client = OpenAI(
+                base_url=self.chat_endpoints[provider],
+                api_key=self.api_keys[provider],
+                max_retries=0,
+            )
+
+            # construct the parameters for the chat completion request
+            parameters = {
+                "model": model,
+                "messages": [
+                {
+                    "role": "user",
+                    "content": content
+                }
+                ],
+                "temperature": 0.1,
+                "max_completion_tokens": 4096,
+                "top_p": 1,
             }
-            ],
-            "temperature": 0.1,
-            "max_completion_tokens": 4096,
-            "top_p": 1,
-        }
-        # Special handling for Groq API
-        if config["provider"] == "groq":
-            parameters["reasoning_effort"] = "none"
-        
-        completion = client.chat.completions.create(**parameters)
+            # Special handling for Groq API
+            if provider == "groq":
+                parameters["reasoning_effort"] = "none"
+            
+            return client.chat.completions.with_raw_response.create(**parameters)
+
+        # Rough estimates: the prompt's tokens and a reply as long as the dictation
+        tokens = len(content) // self.CHARS_PER_TOKEN
+        expected_output = (len(content) - len(config["prompt"] or "")) / self.CHARS_PER_TOKEN
+        candidates = self.request_candidates(config["mode"], config["provider"], config["model_name"], expected_output)
+
+        def output_tokens(completion) -> float:
+            if completion.usage is not None:
+                return completion.usage.completion_tokens
+            return len(completion.choices[0].message.content or "") / self.CHARS_PER_TOKEN
+
+        completion = self.send_with_limits(send, candidates, tokens, config.get("priority", INTERACTIVE),
+                                           output_tokens)
         
         return completion.choices[0].message.content
+
+    def request_candidates(self, kind: str, provider: str, model: str, size: float) -> List[Tuple[str, str]]:
+        """
+        The models to try in order: the routing candidates ranked by expected time for a request
+        of this size, or the configured model, followed by the allowed rate-limit alternatives.
+        """
+        routed = [tuple(candidate) for candidate in self.routing_candidates.get(kind, [])
+                  if self.api_keys.get(candidate[0])]
+        candidates = self.router.rank(routed, size) if routed else [(provider, model)]
+        for alternative in self.fallback_models.get(kind, []):
+            alternative = tuple(alternative)
+            if alternative not in candidates and self.api_keys.get(alternative[0]):
+                candidates.append(alternative)
+        return candidates
+
+    def send_with_limits(self, send: Callable, candidates: List[Tuple[str, str]], tokens: int,
+                         priority: int, measure: Callable):
+        """
+        Sends a request through the rate-limit scheduler and feeds the response headers back to it.
+        A 429 blocks that model and moves the request to the next allowed one; other request
+        errors drop the model from this request, unless the API key itself was refused.
+        Timings and errors are recorded for model routing; `measure` gives the size of a result.
+        """
+        remaining = list(candidates)
+        attempts = 0
+        while True:
+            attempts += 1
+            provider, model = self.scheduler.acquire(remaining, tokens, priority)
+            started = time.perf_counter()
+            try:
+                response = send(provider, model)
+            except openai.RateLimitError as error:
+                self.scheduler.rate_limited(provider, model, error.response.headers)
+                if attempts >= len(candidates):
+                    raise
+                continue
+            except (openai.AuthenticationError, openai.PermissionDeniedError):
+                raise
+            except openai.APIError:
+                self.router.record_error(provider, model)
+                remaining.remove((provider, model))
+                if not remaining:
+                    raise
+                continue
+
+            self.scheduler.update(provider, model, response.headers)
+            result = response.parse()
+            self.router.record(provider, model, measure(result), time.perf_counter() - started)
+            return result
     
     def get_json_config(self) -> Dict:
         """Loads configuration from a JSON file."""
@@ -178,25 +407,42 @@ class Nasikh:
             "translation_prompt": self.translation_prompt,
             "arabic_provider": self.arabic_provider,
             "arabic_model": self.arabic_model,
-            "arabic_prompt": self.arabic_prompt
+            "arabic_prompt": self.arabic_prompt,
+            "native_capture": self.native_capture,
+            "capture_process": self.capture_process,
+            "fallback_models": self.fallback_models,
+            "routing_candidates": self.routing_candidates,
+            "profile_slow_dictations": self.profile_slow_dictations,
+            "slow_dictation_seconds": self.slow_dictation_seconds,
+            "custom_modes": self.custom_modes,
+            "fanout_modes": self.fanout_modes,
+            "chunked_cleanup": self.chunked_cleanup,
+            "incremental_cleanup": self.incremental_cleanup,
+            "incremental_final_pass": self.incremental_final_pass,
+            "speculative_transcription": self.speculative_transcription,
         }
         with open("config.json", "w", encoding="utf-8") as file:
             json.dump(config, file, indent=4)
 
-    def get_transcription_config(self) -> Dict:
+    def get_transcription_config(self, mode: str | None = None) -> Dict:
         """
-        Gets the transcription provider and model based on the current mode.
+        Gets the transcription provider and model based on the given or current mode.
         Returns them in a single configuration dictionary.
         """
-        if self.mode == "arabic":
+        mode = mode or self.mode
+        if mode == "arabic":
             provider = self.transcription_provider
             model_name = self.transcription_model
-        elif self.mode == "english":
+        elif mode == "english":
             provider = self.english_provider
             model_name = self.english_model
-        elif self.mode == "translation":
+        elif mode == "translation":
             provider = self.translation_provider
             model_name = self.translation_model
+        else:
+            # User-defined modes share the Arabic transcription settings
+            provider = self.transcription_provider
+            model_name = self.transcription_model
         
         return {
             "provider": provider,
@@ -205,28 +451,37 @@ class Nasikh:
             "model_name": model_name,
         }
     
-    def get_chat_config(self) -> dict:
+    def get_chat_config(self, mode: str | None = None) -> dict:
         """
-        Gets the chat provider, model, and prompt based on the current mode.
+        Gets the chat provider, model, and prompt based on the given or current mode.
         Returns them in a single configuration dictionary.
         """
-        if self.mode == "arabic":
+        mode = mode or self.mode
+        if mode == "arabic":
             provider = self.arabic_provider
             api_key = self.api_keys[provider]
             model_name = self.arabic_model
             prompt = self.arabic_prompt
-        elif self.mode == "english":
+        elif mode == "english":
             provider = self.english_provider
             api_key = self.api_keys[provider]
             model_name = self.english_model
             prompt = self.english_prompt
-        elif self.mode == "translation":
+        elif mode == "translation":
             provider = self.translation_provider
             api_key = self.api_keys[provider]
             model_name = self.translation_model
             prompt = self.translation_prompt
+        else:
+            # User-defined mode profile
+            profile = self.custom_modes[mode]
+            provider = profile["provider"]
+            api_key = self.api_keys[provider]
+            model_name = profile["model"]
+            prompt = profile["prompt"]
 
         return {
+            "mode": mode,
             "provider": provider,
             "api_endpoint": self.chat_endpoints[provider],
             "api_key": api_key,
@@ -238,30 +493,133 @@ class Nasikh:
         """Starts the audio recording stream."""
         self.recording = True
         self.audio_chunks = []
+        self.pcm_chunks = []
+        self.pcm_samples = 0
+        self.resampler = None
+        self.capture_stats = {"input_overflow": 0, "input_underflow": 0, "ring_overrun": 0}
+        self.level_meter.reset()
+        self.diagnostics.recording_started()
+        self.open_stream()
+
+        if self.incremental_cleanup and self.mode != "fanout":
+            mode = self.mode
+            self.incremental = IncrementalCleanup(
+                lambda start: self.drain_audio(start=start),
+                lambda audio_data: self.transcript_pcm(audio_data, mode),
+                lambda context, previous, user_input: self.cleanup_segment(context, previous, user_input, mode),
+                self.RATE
+            )
+            self.incremental.start()
+        elif self.speculative_transcription:
+            mode = self.fanout_modes[0] if self.mode == "fanout" else self.mode
+            self.speculative = SpeculativeTranscription(
+                lambda audio_data: self.transcript_pcm(audio_data, mode), self.RATE
+            )
+
+    def open_stream(self) -> None:
+        """Opens and starts an input stream that appends blocks to the audio chunks."""
+        if self.native_capture:
+            device = sd.query_devices(kind="input")
+            self.capture_rate = int(device["default_samplerate"])
+            self.capture_channels = max(1, min(int(device["max_input_channels"]), 2))
+
+            native_format = (self.capture_rate, self.capture_channels)
+            if self.resampler is None or (self.resampler.input_rate, self.resampler.channels) != native_format:
+                # The device may change across a pause; convert what we have with the old format first
+                self.convert_audio()
+                self.resampler = StreamingResampler(self.capture_rate, self.RATE, self.capture_channels)
+        else:
+            self.capture_rate = self.RATE
+            self.capture_channels = 1
+
+        if self.capture is not None:
+            def remote_callback(block):
+                # Runs on the ring reader thread, so converting for the meter here is fine
+                if self.recording:
+                    self.level_meter.publish(block.astype(np.float32) / 32768.0)
+                    self.audio_chunks.append(block)
+
+            # Only keep the stream once it started, so close_stream never sees a half-opened one
+            stream = self.capture.stream(self.capture_rate, self.capture_channels, remote_callback)
+            stream.start()
+            self.stream = stream
+            self.convert_timer.start()
+            return
 
         def callback(indata, frames, time, status):
+            if status.input_overflow:
+                self.capture_stats["input_overflow"] += 1
+            if status.input_underflow:
+                self.capture_stats["input_underflow"] += 1
             if self.recording:
-                self.audio_chunks.append((indata * 32767).astype(np.int16).copy())
-        
-        self.stream = sd.InputStream(
-            samplerate=self.RATE,
-            channels=1,
+                self.level_meter.publish(indata)
+                if self.resampler is not None:
+                    # Keep the callback to a copy; resampling happens in convert_audio
+                    self.audio_chunks.append(indata.copy())
+                else:
+                    self.audio_chunks.append((indata * 32767).astype(np.int16).copy())
+
+        stream = sd.InputStream(
+            samplerate=self.capture_rate,
+            channels=self.capture_channels,
             callback=callback,
             dtype='float32'
         )
-        self.stream.start()
+        stream.start()
+        self.stream = stream
+        self.convert_timer.start()
 
-    def stop_recording(self) -> io.BytesIO | None:
-        """Stops the stream and returns the audio data as a WAV buffer."""
+    def close_stream(self) -> None:
+        """Stops the input stream and adds its xrun counts to the recording's capture stats."""
         if self.stream:
-            self.stream.stop()
-            self.stream.close()
-            self.stream = None
-        
-        if not self.audio_chunks:
-            return None
-        
-        audio_data = np.concatenate(self.audio_chunks)
+            stream, self.stream = self.stream, None
+            try:
+                stream.stop()
+                stream.close()
+            except RuntimeError as error:
+                # The capture process died; the audio it delivered before that is kept
+                self.tray.showMessage("Nasikh", f"Recording stopped unexpectedly and may be incomplete:\n{error}")
+            if isinstance(stream, RemoteStream):
+                for key, count in stream.stats.items():
+                    self.capture_stats[key] += count
+        self.convert_timer.stop()
+
+    @Slot()
+    def convert_audio(self, final: bool = False) -> None:
+        """Converts the blocks captured since the last call to 16 kHz mono int16 and frees them."""
+        with self.audio_lock:
+            # The capture callback only appends, so the first `count` blocks are safe to take
+            count = len(self.audio_chunks)
+            pending = self.audio_chunks[:count]
+            del self.audio_chunks[:count]
+
+            if self.resampler is None:
+                converted = pending
+            else:
+                converted = [to_int16(self.resampler.process(block)) for block in pending]
+                if final:
+                    converted.append(to_int16(self.resampler.flush()))
+            self.pcm_chunks.extend(converted)
+            self.pcm_samples += sum(len(chunk) for chunk in converted)
+
+    def drain_audio(self, final: bool = False, start: int = 0) -> np.ndarray:
+        """Converts captured blocks to 16 kHz mono int16 and returns the samples from `start` on."""
+        self.convert_audio(final)
+        with self.audio_lock:
+            # Walk back from the end, so reading only the latest stretch does not copy the whole recording
+            tail = []
+            offset = self.pcm_samples
+            for chunk in reversed(self.pcm_chunks):
+                if offset <= start:
+                    break
+                tail.append(chunk.reshape(-1))
+                offset -= len(chunk)
+            if not tail:
+                return np.zeros(0, dtype=np.int16)
+            return np.concatenate(tail[::-1])[start - offset:]
+
+    def encode_wav(self, audio_data: np.ndarray) -> io.BytesIO | None:
+        """Encodes 16 kHz mono int16 samples as a WAV buffer within the upload limit."""
         wav_buffer = io.BytesIO()
         
         with wave.open(wav_buffer, 'wb') as w:
@@ -273,38 +631,56 @@ class Nasikh:
         wav_buffer.seek(0)
         
         file_size_mb = wav_buffer.getbuffer().nbytes / (1024 * 1024)
-        duration_seconds = len(audio_data) / self.RATE
 
         if file_size_mb > self.MAX_FILE_SIZE_MB:
             return None
         
         return wav_buffer
+
+    def transcript_pcm(self, audio_data: np.ndarray, mode: str | None = None, priority: int = INTERACTIVE) -> str:
+        """Transcribes 16 kHz mono int16 samples."""
+        wav_buffer = self.encode_wav(audio_data)
+        if wav_buffer is None:
+            return ""
+        return self.transcript(wav_buffer, mode, priority)
+
+    def stop_recording(self) -> io.BytesIO | None:
+        """Stops the stream and returns the audio data as a WAV buffer."""
+        self.close_stream()
+        
+        if not self.audio_chunks and not self.pcm_chunks:
+            return None
+        
+        audio_data = self.drain_audio(final=True)
+        return self.encode_wav(audio_data)
     
     @Slot()
     def pause_toggle(self) -> None:
         """Pauses or resumes the current recording without stopping the stream."""
         with self.thread_lock:
             if self.stream and self.recording:
-                self.stream.stop()
-                self.stream.close()
-                self.stream = None 
+                self.close_stream()
                 self.recording = False
                 self.paused = True
 
+                # Use the pause: start on what has been said so far in the background
+                if self.incremental is not None:
+                    self.incremental.request_cut()
+                elif self.speculative is not None:
+                    self.speculative.pause(self.drain_audio())
+
             else:
                 self.recording = True
+                self.paused = False
+                try:
+                    self.open_stream()
+                except (sd.PortAudioError, RuntimeError) as error:
+                    # Stay paused so the audio recorded so far can still be stopped and processed
+                    self.recording = False
+                    self.paused = True
+                    self.tray.showMessage("Nasikh", f"Could not resume recording:\n{error}")
 
-                def callback(indata, frames, time, status):
-                    if self.recording:
-                        self.audio_chunks.append((indata * 32767).astype(np.int16).copy())
-                
-                self.stream = sd.InputStream(
-                    samplerate=self.RATE,
-                    channels=1,
-                    callback=callback,
-                    dtype='float32'
-                )
-                self.stream.start()
+            self.recording_window.set_paused(self.paused)
 
     @Slot()
     def cancel_recording(self) -> None:
@@ -312,9 +688,33 @@ class Nasikh:
         with self.thread_lock:
             if self.recording or self.paused:
                 self.stop_recording()
+                if self.incremental is not None:
+                    self.incremental.cancel()
+                    self.incremental = None
+                if self.speculative is not None:
+                    self.speculative.cancel()
+                    self.speculative = None
+                self.diagnostics.recording_cancelled()
                 self.recording = False
+                self.paused = False
                 self.recording_window.hide()
 
+    @Slot(str)
+    def handle_hotkey(self, name: str) -> None:
+        """Routes a global hotkey to dictation or to pasting a fan-out alternate."""
+        if name == "alternate":
+            self.paste_alternate()
+        else:
+            self.toggle_dictation(name)
+
+    def paste_alternate(self) -> None:
+        """Pastes the next other output of the last fan-out dictation, cycling through them."""
+        if not self.alternates or self.recording or self.paused:
+            return
+        text = self.alternates.pop(0)
+        self.alternates.append(text)
+        self.paste(text)
+
     @Slot()
     def toggle_dictation(self,  mode: str) -> None:
         """Starts or stops the dictation process."""
@@ -323,27 +723,138 @@ class Nasikh:
                 # If recording, stop it
                 audio_buffer = self.stop_recording()
                 self.recording = False
+                self.paused = False
                 self.recording_window.hide()
+                incremental, self.incremental = self.incremental, None
+                speculative, self.speculative = self.speculative, None
                 
                 if audio_buffer is None:
+                    if incremental is not None:
+                        incremental.cancel()
+                    if speculative is not None:
+                        speculative.cancel()
+                    self.diagnostics.recording_cancelled()
                     return 
             
-                # Process the audio that was recorded
-                self.process_and_paste(audio_buffer)
+                # Store the recording first; the worker transcribes it without blocking the UI
+                job_id = self.job_queue.enqueue(self.mode, audio_buffer.getvalue(),
+                                                self.foreground_window(), self.capture_stats)
+                if incremental is not None:
+                    audio_data = self.drain_audio()
+                    incremental.read_audio = lambda start: audio_data[start:]
+                    self.incremental_jobs[job_id] = incremental
+                if speculative is not None and speculative.parts:
+                    self.speculative_jobs[job_id] = speculative
+                elif speculative is not None:
+                    speculative.cancel()
+                self.diagnostics.recording_queued(job_id)
+                self.job_worker.notify()
+
+                if self.capture_stats["input_overflow"] or self.capture_stats["ring_overrun"]:
+                    self.tray.showMessage("Nasikh", "Some audio was dropped during this recording "
+                                          f"({self.capture_stats['input_overflow']} input overflows, "
+                                          f"{self.capture_stats['ring_overrun']} buffer overruns).")
 
             else:
                 # If not recording, start a new one
                 self.recording = True
                 self.mode = mode
-                self.start_recording()
+                try:
+                    self.start_recording()
+                except (sd.PortAudioError, RuntimeError) as error:
+                    self.recording = False
+                    self.diagnostics.recording_cancelled()
+                    self.tray.showMessage("Nasikh", f"Could not start recording:\n{error}")
+                    return
+                self.recording_window.set_paused(False)
                 self.recording_window.show_window()
 
-    def process_and_paste(self, audio_buffer: io.BytesIO) -> None:
-        """Transcribes audio, cleans it, and pastes the result."""
-        user_input = self.transcript(audio_buffer)
+    def process_job(self, job: Dict) -> str:
+        """Transcribes and cleans a queued recording; runs on the job worker thread."""
+        # A dictation the user is waiting on goes first; backlog from outages or restarts yields to it
+        fresh = time.time() - job["created_at"] < self.PASTE_WINDOW_SECONDS
+        priority = INTERACTIVE if fresh else BACKGROUND
+
+        try:
+            with self.diagnostics.dictation(f"job{job['id']}"):
+                incremental = self.incremental_jobs.get(job["id"])
+                if incremental is not None:
+                    text = self.finish_incremental(incremental, job["mode"])
+                elif job["mode"] == "fanout":
+                    text = self.process_fanout(job, priority)
+                else:
+                    user_input = self.transcribe_job(job, job["mode"], priority)
+                    text = self.cleanup(user_input, job["mode"], priority)
+        finally:
+            # A failed attempt ends the memory diff too, so tracing never outlives the job
+            self.diagnostics.job_finished(job["id"])
+
+        self.incremental_jobs.pop(job["id"], None)
+        self.speculative_jobs.pop(job["id"], None)
+        return text
+
+    def transcribe_job(self, job: Dict, mode: str, priority: int) -> str:
+        """Transcribes a job's audio, reusing the parts transcribed during its pauses."""
+        speculative = self.speculative_jobs.get(job["id"])
+        if speculative is None:
+            return self.transcript(io.BytesIO(job["audio"]), mode, priority)
+
+        # The job's WAV holds the same samples the pauses were cut from, after a 44 byte header
+        audio_data = np.frombuffer(job["audio"], dtype=np.int16, offset=44)
+        return speculative.finish(audio_data, lambda audio: self.transcript_pcm(audio, mode, priority))
 
-        clean_user_input = self.cleanup(user_input)
+    def process_fanout(self, job: Dict, priority: int) -> str:
+        """
+        Transcribes once and cleans the transcript with every fan-out mode in parallel.
+        Returns the first mode's result and keeps the others for paste_alternate.
+        """
+        modes = self.fanout_modes
+        user_input = self.transcribe_job(job, modes[0], priority)
+
+        with ThreadPoolExecutor(max_workers=len(modes)) as executor:
+            results = list(executor.map(lambda mode: self.cleanup(user_input, mode, priority), modes))
+
+        self.fanout_results[job["id"]] = results[1:]
+        return results[0]
+
+    @Slot(int, str)
+    def deliver_result(self, job_id: int, text: str) -> None:
+        """Pastes a finished result, or keeps it in history if the user has moved on."""
+        job = self.job_queue.get(job_id)
+        self.update_history()
+        if job_id in self.fanout_results:
+            self.alternates = self.fanout_results.pop(job_id)
+
+        fresh = time.time() - job["created_at"] < self.PASTE_WINDOW_SECONDS
+        same_window = job["target"] is None or job["target"] == self.foreground_window()
+
+        if fresh and same_window and not (self.recording or self.paused):
+            self.paste(text)
+        else:
+            self.tray.showMessage("Nasikh", "Dictation ready. Pick it from History in the tray menu.")
 
+    @Slot(int, str)
+    def report_failure(self, job_id: int, error: str) -> None:
+        """Tells the user a recording could not be processed; its audio stays in the queue."""
+        self.incremental_jobs.pop(job_id, None)
+        self.speculative_jobs.pop(job_id, None)
+        self.fanout_results.pop(job_id, None)
+        self.tray.showMessage("Nasikh", f"A dictation could not be processed and was kept for retry:\n{error}")
+
+    def update_history(self) -> None:
+        """Refreshes the tray's history menu from the job queue."""
+        self.tray.set_history([job["result"] for job in self.job_queue.history()])
+        pending = self.job_queue.pending_count()
+        self.tray.setToolTip(f"Nasikh ({pending} queued)" if pending else "Nasikh")
+
+    def foreground_window(self) -> int | None:
+        """Returns a handle for the focused window where the platform exposes one."""
+        if self.system == "windows":
+            return ctypes.windll.user32.GetForegroundWindow()
+        return None
+
+    def paste(self, clean_user_input: str) -> None:
+        """Pastes text into the focused application, keeping the user's clipboard."""
         # Saving the original clipboard content
         try:
             original_clipboard = pyperclip.paste()
@@ -364,6 +875,22 @@ class Nasikh:
         if original_clipboard is not None:
             pyperclip.copy(original_clipboard)
     
+    def finish_incremental(self, incremental: IncrementalCleanup, mode: str) -> str:
+        """Cleans the last stretch of an incremental dictation and returns the joined text."""
+        text = incremental.finish()
+
+        if self.incremental_final_pass and incremental.segments > 1:
+            config = self.get_chat_config(mode)
+            content = (
+                "The following text was refined in parts. Make only the edits needed where the parts "
+                + "meet: remove repeated words, fix punctuation, and apply self-corrections that span "
+                + "parts. Keep the language and wording otherwise unchanged and output only the text.\n\n"
+                + text
+            )
+            text = self.complete(config, content)
+
+        return text
+
     def test_api_keys(self, provider: str, api_key: str) -> bool:
         """Checks if the provided API key is valid"""
         try:
@@ -377,6 +904,32 @@ class Nasikh:
         except Exception as e:
             return False
 
+    @Slot()
+    def profile_next_dictations(self) -> None:
+        """Profiles the processing of the next few dictations."""
+        self.diagnostics.profile_next(self.PROFILE_DICTATIONS)
+        self.tray.showMessage("Nasikh", f"Profiling the next {self.PROFILE_DICTATIONS} dictations.")
+
+    @Slot(bool)
+    def toggle_slow_profiling(self, enabled: bool) -> None:
+        """Turns the automatic profile of slow dictations on or off and remembers the choice."""
+        self.profile_slow_dictations = enabled
+        self.diagnostics.slow_threshold = self.slow_dictation_seconds if enabled else None
+        self.save_json_config()
+
+    @Slot()
+    def open_diagnostics(self) -> None:
+        os.makedirs(self.diagnostics.folder, exist_ok=True)
+        QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.abspath(self.diagnostics.folder)))
+
+    @Slot()
+    def show_settings(self) -> None:
+        """Opens the settings dialog with up to date model speeds."""
+        for tab in (self.transcription_tab, self.english_tab, self.arabic_tab, self.translation_tab):
+            tab.routing_list.refresh()
+            tab.update_speed_label()
+        self.setting.show()
+
     def save_setting_menu(self):
         self.api_keys["groq"] = self.api_keys_tab.groq_api_field.text().strip() or None
         self.api_keys["openrouter"] = self.api_keys_tab.openrouter_api_field.text().strip() or None
@@ -396,7 +949,17 @@ class Nasikh:
         self.translation_model = self.translation_tab.model_menu.currentText()
         self.translation_prompt = self.translation_tab.prompt_field.toPlainText()
 
+        self.routing_candidates = {
+            "transcription": self.transcription_tab.routing_list.selected(),
+            "english": self.english_tab.routing_list.selected(),
+            "arabic": self.arabic_tab.routing_list.selected(),
+            "translation": self.translation_tab.routing_list.selected(),
+        }
+
         self.save_json_config()
+        # Jobs parked on a bad key or model get another chance with the new settings
+        if self.job_queue.requeue_failed():
+            self.job_worker.notify()
         self.setting.accept()              
 
     def run(self) -> None:
@@ -413,7 +976,9 @@ class Nasikh:
         self.transcription_tab = TranscriptionTab(self.transcription_endpoints,
                                                                    self.transcription_provider,
                                                                    self.transcription_model,
-                                                                   self.api_keys)
+                                                                   self.api_keys,
+                                                                   self.router,
+                                                                   self.routing_candidates.get("transcription", []))
 
         #____________ English Tab ____________
 
@@ -422,7 +987,9 @@ class Nasikh:
                                     self.english_provider, 
                                     self.english_model, 
                                     self.english_prompt, 
-                                    self.api_keys)
+                                    self.api_keys,
+                                    self.router,
+                                    self.routing_candidates.get("english", []))
 
         #____________ Arabic Tab ____________
 
@@ -431,7 +998,9 @@ class Nasikh:
                                    self.arabic_provider,
                                    self.arabic_model,
                                    self.arabic_prompt,
-                                   self.api_keys)
+                                   self.api_keys,
+                                   self.router,
+                                   self.routing_candidates.get("arabic", []))
 
         #____________ Translation Tab ____________
 
@@ -440,7 +1009,9 @@ class Nasikh:
                                         self.translation_provider,
                                         self.translation_model,
                                         self.translation_prompt,
-                                        self.api_keys)
+                                        self.api_keys,
+                                        self.router,
+                                        self.routing_candidates.get("translation", []))
 
         #____________ Setting UI ____________
 
@@ -466,7 +1037,22 @@ class Nasikh:
         self.setting.setWindowTitle("Nasikh Settings")
         self.setting.setWindowIcon(self.icon)
 
+        #____________ Audio Capture ____________
+
+        if self.capture_process:
+            self.capture = CaptureProcess()
+            self.app.aboutToQuit.connect(self.capture.shutdown)
+
+        #____________ Diagnostics ____________
+
+        self.tray.slow_action.setChecked(self.profile_slow_dictations)
+        self.diagnostics.slow_threshold = self.slow_dictation_seconds if self.profile_slow_dictations else None
+
+        #____________ Job Queue ____________
 
+        # Jobs left over from a previous session are picked up here
+        self.update_history()
+        self.job_worker.start()
 
         # run the GUI application
         sys.exit(self.app.exec())
@@ -0,0 +1,121 @@
+import threading
+import numpy as np
+from typing import Callable
+from src.text.chunking import split_sentences
+
+
+class IncrementalCleanup:
+    """
+    Transcribes and cleans each finished stretch of speech while recording continues.
+
+    Cleaned text is kept in two parts: `context`, which is final and only shown to the
+    model as read-only background, and `tail`, the last cleaned sentence, which is
+    rewritten together with the next stretch so a self-correction that spans the
+    pause ("... on Tuesday. Sorry, I mean Wednesday") still resolves.
+    """
+
+    FRAME_SECONDS = 0.02
+
+    def __init__(self, read_audio: Callable[[int], np.ndarray], transcribe: Callable[[np.ndarray], str],
+                 clean: Callable[[str, str, str], str], rate: int, silence_seconds: float = 0.7,
+                 min_segment_seconds: float = 3.0, poll_seconds: float = 0.25):
+        # Returns the recording's samples from the given index on, so each poll only sees the current stretch
+        self.read_audio = read_audio
+        self.transcribe = transcribe
+        self.clean = clean
+        self.rate = rate
+        self.frame = int(rate * self.FRAME_SECONDS)
+        self.silence_frames = int(silence_seconds / self.FRAME_SECONDS)
+        self.min_segment = int(min_segment_seconds * rate)
+        self.poll_seconds = poll_seconds
+
+        # Sample index where the next stretch starts, and the cleaned text so far
+        self.cut = 0
+        self.context = ""
+        self.tail = ""
+        self.segments = 0
+
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.cut_requested = threading.Event()
+        self.cancelled = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def run(self) -> None:
+        """Watches the recording for pauses and processes each finished stretch."""
+        while not self.stopped.wait(self.poll_seconds):
+            try:
+                pending = self.read_audio(self.cut)
+                if self.cut_requested.is_set():
+                    self.cut_requested.clear()
+                    boundary = len(pending) if len(pending) > 0 else None
+                else:
+                    boundary = self.find_boundary(pending)
+                if boundary is not None:
+                    self.process(pending[:boundary])
+                    self.cut += boundary
+            except Exception:
+                # Leave the rest of the recording to finish(), which reports errors to the caller
+                return
+
+    def find_boundary(self, pending: np.ndarray) -> int | None:
+        """Returns the middle of the first long enough silence in the audio after the cut, if any."""
+        frames = len(pending) // self.frame
+        if len(pending) < self.min_segment or frames <= self.silence_frames:
+            return None
+
+        blocks = pending[:frames * self.frame].reshape(frames, self.frame).astype(np.float32)
+        rms = np.sqrt(np.mean(blocks * blocks, axis=1))
+        # Relative to the quiet frames of this stretch so background noise does not count as speech
+        threshold = max(300.0, 3.0 * float(np.percentile(rms, 10)))
+        quiet = rms < threshold
+
+        first = self.min_segment // self.frame
+        run = 0
+        for index in range(first, frames):
+            run = run + 1 if quiet[index] else 0
+            if run == self.silence_frames:
+                middle = index - self.silence_frames // 2
+                return middle * self.frame
+        return None
+
+    def process(self, audio: np.ndarray) -> None:
+        """Transcribes one stretch and folds its cleaned text into the running buffer."""
+        if len(audio) == 0:
+            return
+        raw = (self.transcribe(audio) or "").strip()
+        if not raw:
+            return
+
+        with self.lock:
+            if self.cancelled:
+                return
+            revised = (self.clean(self.context, self.tail, raw) or "").strip()
+            sentences = split_sentences(revised)
+            self.context = (self.context + " " + "".join(sentences[:-1])).strip()
+            self.tail = sentences[-1].strip() if sentences else ""
+            self.segments += 1
+
+    def request_cut(self) -> None:
+        """Treats the end of the audio so far as a boundary, e.g. because the user paused."""
+        self.cut_requested.set()
+
+    def finish(self) -> str:
+        """Stops watching, cleans whatever follows the last cut and returns the full text."""
+        self.stopped.set()
+        self.thread.join()
+        pending = self.read_audio(self.cut)
+        self.process(pending)
+        self.cut += len(pending)
+        return self.text()
+
+    def cancel(self) -> None:
+        """Stops watching and drops the results; an in-flight request is left to finish unused."""
+        self.cancelled = True
+        self.stopped.set()
+
+    def text(self) -> str:
+        return (self.context + " " + self.tail).strip()
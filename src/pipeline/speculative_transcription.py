@@ -0,0 +1,56 @@
+import numpy as np
+from typing import Callable, List
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class SpeculativeTranscription:
+    """
+    Transcribes the audio recorded up to each pause in the background, while the user thinks.
+    At stop only the audio after the last pause is left to transcribe; the parts are joined
+    in order. Cancelling drops queued work and ignores whatever is still in flight.
+    """
+
+    def __init__(self, transcribe: Callable[[np.ndarray], str], rate: int, min_seconds: float = 1.0):
+        self.transcribe = transcribe
+        self.min_samples = int(min_seconds * rate)
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        # (start, end, future) for every stretch sent off so far, in recording order
+        self.parts: List[tuple[int, int, Future]] = []
+        self.cut = 0
+
+    def pause(self, audio: np.ndarray) -> None:
+        """Starts transcribing everything recorded since the previous pause."""
+        if len(audio) - self.cut < self.min_samples:
+            return
+        start, end = self.cut, len(audio)
+        self.parts.append((start, end, self.executor.submit(self.transcribe, audio[start:end])))
+        self.cut = end
+
+    def finish(self, audio: np.ndarray, transcribe: Callable[[np.ndarray], str] | None = None) -> str:
+        """
+        Waits for the speculative parts, transcribes the rest and returns the joined transcript.
+        A part that failed in the background is transcribed again here, so errors reach the caller.
+        `transcribe` replaces the constructor's function for this remaining work, e.g. to lower its priority.
+        """
+        transcribe = transcribe or self.transcribe
+        texts = []
+        for index, (start, end, future) in enumerate(self.parts):
+            try:
+                text = future.result()
+            except Exception:
+                text = transcribe(audio[start:end])
+                # Keep the result in case a later part fails and the job is retried
+                done = Future()
+                done.set_result(text)
+                self.parts[index] = (start, end, done)
+            texts.append((text or "").strip())
+
+        if len(audio) > self.cut:
+            texts.append((transcribe(audio[self.cut:]) or "").strip())
+
+        self.executor.shutdown(wait=False)
+        return " ".join(text for text in texts if text)
+
+    def cancel(self) -> None:
+        """Drops parts that have not started; a request already in flight finishes unused."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,98 @@
+import re
+from typing import List, Tuple
+
+# Sentence ends in Latin and Arabic script: . ! ? … plus the Arabic question mark and full stop
+SENTENCE_END = re.compile(r"(?<=[.!?…؟۔])[\"'»)\]]*\s+")
+# Weaker break points used when a single sentence is longer than a chunk
+CLAUSE_END = re.compile(r"(?<=[,،;؛:])\s+")
+PARAGRAPH_END = re.compile(r"\n\s*\n")
+# Arabic letters are joined only within a word, so whitespace is still the last resort
+WORD_END = re.compile(r"\s+")
+
+
+def split_on(pattern: re.Pattern, text: str) -> List[str]:
+    """Splits text after each match, keeping the separator on the left piece."""
+    pieces = []
+    start = 0
+    for match in pattern.finditer(text):
+        pieces.append(text[start:match.end()])
+        start = match.end()
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+
+def split_sentences(text: str) -> List[str]:
+    """Splits text into sentences, keeping trailing punctuation and whitespace."""
+    sentences = []
+    for paragraph in split_on(PARAGRAPH_END, text):
+        sentences.extend(split_on(SENTENCE_END, paragraph))
+    return sentences
+
+
+def split_long(piece: str, max_chars: int) -> List[str]:
+    """Breaks an overlong sentence on clauses, then on words."""
+    if len(piece) <= max_chars:
+        return [piece]
+
+    for pattern in (CLAUSE_END, WORD_END):
+        parts = split_on(pattern, piece)
+        if len(parts) > 1:
+            return pack(parts, max_chars, split_deeper=pattern is CLAUSE_END)
+    return [piece[i:i + max_chars] for i in range(0, len(piece), max_chars)]
+
+
+def pack(pieces: List[str], max_chars: int, split_deeper: bool = True) -> List[str]:
+    """Greedily packs consecutive pieces into chunks of at most max_chars."""
+    chunks = []
+    current = ""
+    for piece in pieces:
+        if len(piece) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.extend(split_long(piece, max_chars) if split_deeper else [piece])
+        elif len(current) + len(piece) > max_chars and current:
+            chunks.append(current)
+            current = piece
+        else:
+            current += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def chunk_text(text: str, max_chars: int) -> List[Tuple[str, str]]:
+    """
+    Splits text into chunks on sentence and paragraph boundaries.
+    Returns (chunk, separator) pairs where separator is the whitespace that followed the chunk.
+    """
+    chunks = []
+    for chunk in pack(split_sentences(text), max_chars):
+        body = chunk.rstrip()
+        chunks.append((body, chunk[len(body):]))
+    return chunks
+
+
+def normalize(sentence: str) -> str:
+    """Reduces a sentence to its letters so echoed context can be recognised."""
+    return re.sub(r"[\W_]+", "", sentence).casefold()
+
+
+def join_chunks(cleaned: List[str], separators: List[str]) -> str:
+    """
+    Reassembles cleaned chunks in order and repairs the seams between them:
+    a sentence repeated on both sides of a seam is kept once, and the original
+    paragraph break or space is restored between chunks.
+    """
+    result = ""
+    for text, separator in zip(cleaned, separators):
+        text = text.strip()
+        if result and text:
+            previous_last = split_sentences(result.rstrip())[-1]
+            first, *rest = split_sentences(text)
+            if normalize(first) and normalize(first) == normalize(previous_last):
+                text = "".join(rest).strip()
+        if text:
+            result += text + ("\n" * min(separator.count("\n"), 2) or " ")
+    return result.strip()